@@ -1,12 +1,34 @@
 from z3 import *
+from solvers import make_solver
+import argparse
 
-def detect_bugs():
+def detect_bugs(bits=None, signed=True):
     # Initialize Z3 solver
-    solver = Solver()
+    solver = make_solver()
+
+    # Machine-integer mode: with `bits` set (8/16/32/64), variables are
+    # BitVecs of that width with signed or unsigned semantics, so queries are
+    # bit-blasted and wrap-around (overflow) behaves like C integers.
+    # Without it, variables are unbounded mathematical Ints.
+    def var(name):
+        return Int(name) if bits is None else BitVec(name, bits)
+
+    def lt(a, b):
+        return a < b if bits is None or signed else ULT(a, b)
+
+    def gt(a, b):
+        return a > b if bits is None or signed else UGT(a, b)
+
+    def ge(a, b):
+        return a >= b if bits is None or signed else UGE(a, b)
+
+    def value(v):
+        # Bitvector models are unsigned; show signed values as such.
+        return v.as_signed_long() if bits is not None and signed else v
 
     # Example 1: Division by zero detection
     def detect_division_by_zero():
-        x = Int('x')
+        x = var('x')
         solver.push()
         solver.add(x == 0)  # Potential division by zero
         condition = Not(x == 0)  # Safe condition: x ≠ 0
@@ -20,24 +42,24 @@ def detect_bugs():
     # Example 2: Array out-of-bounds detection
     def detect_array_oob():
         arr_size = 10
-        index = Int('index')
+        index = var('index')
         solver.push()
-        solver.add(index < 0)  # Check negative index
+        solver.add(lt(index, 0))  # Check negative index
         if solver.check() == sat:
-            print(f"⚠️ Array out-of-bounds (negative index: {solver.model()[index]})")
+            print(f"⚠️ Array out-of-bounds (negative index: {value(solver.model()[index])})")
         solver.pop()
         
         solver.push()
-        solver.add(index >= arr_size)  # Check index ≥ array size
+        solver.add(ge(index, arr_size))  # Check index ≥ array size
         if solver.check() == sat:
-            print(f"⚠️ Array out-of-bounds (index too large: {solver.model()[index]})")
+            print(f"⚠️ Array out-of-bounds (index too large: {value(solver.model()[index])})")
         solver.pop()
 
     # Example 3: Assertion failure detection
     def detect_assertion_failure():
-        a, b = Ints('a b')
+        a, b = var('a'), var('b')
         solver.push()
-        solver.add(a > b, a == 5, b == 10)  # Contradiction (5 > 10)
+        solver.add(gt(a, b), a == 5, b == 10)  # Contradiction (5 > 10)
         if solver.check() == sat:
             print("✅ Assertion holds.")
         else:
@@ -46,23 +68,43 @@ def detect_bugs():
 
     # Example 4: Dead (unreachable) code detection
     def detect_dead_code():
-        x = Int('x')
+        x = var('x')
         solver.push()
-        solver.add(And(x > 10, x < 5))  # Impossible condition
+        solver.add(And(gt(x, 10), lt(x, 5)))  # Impossible condition
         if solver.check() == sat:
             print("✅ Code is reachable.")
         else:
             print("⚠️ Dead code detected (unreachable condition).")
         solver.pop()
 
+    # Example 5: Integer overflow detection (machine-integer mode only)
+    def detect_overflow():
+        x = var('x')
+        solver.push()
+        # Can `x + 1` wrap around at this width?
+        solver.add(Not(BVAddNoOverflow(x, 1, signed)))
+        if solver.check() == sat:
+            print(f"⚠️ Integer overflow possible in x + 1! (x = {value(solver.model()[x])})")
+        else:
+            print("✅ No integer overflow detected.")
+        solver.pop()
+
     # Run all checks
     detect_division_by_zero()
     detect_array_oob()
     detect_assertion_failure()
     detect_dead_code()
+    if bits is not None:
+        detect_overflow()
 
 if __name__ == "__main__":
-    detect_bugs()
+    parser = argparse.ArgumentParser(description="Basic Z3 bug detection checks.")
+    parser.add_argument("--bits", type=int, choices=[8, 16, 32, 64],
+                        help="use fixed-width bitvector semantics of this width")
+    parser.add_argument("--unsigned", action="store_true",
+                        help="with --bits, use unsigned instead of signed semantics")
+    args = parser.parse_args()
+    detect_bugs(bits=args.bits, signed=not args.unsigned)
 
 # Expected output:
 # ⚠️ Division by zero possible! (x = 0)
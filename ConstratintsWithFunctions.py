@@ -1,7 +1,102 @@
 from z3 import *
+from slicing import SlicingSolver
+
+# =============================================
+# Function Summaries
+# =============================================
+# Each helper's precondition and effect are built once as Z3 formulas over
+# fresh formal parameters and memoized by (function name, argument sorts,
+# constants). A call site is checked by substituting its actual arguments
+# into the summary, so summary construction grows with the number of
+# distinct functions rather than with the number of call sites.
+#
+# Verdicts are memoized as well, keyed by the assertions the check depends
+# on (the negated precondition and its slice of the solver's stack) with
+# the context's constants renamed in order of appearance. Call sites that pose the
+# same question up to variable names reuse the answer, so solver calls grow
+# with the number of distinct call-site contexts.
+#
+# Anything else a summary depends on (an array size, a limit, ...) must be
+# passed in `consts` rather than captured by `build`, so that a different
+# value gets its own summary.
+function_summaries = {}
+precondition_verdicts = {}
+
+def summarize(name, arg_sorts, build, consts=()):
+    """Return (params, precondition, effect) for `name`, building it on first use."""
+    key = (name, tuple(arg_sorts), tuple(consts))
+    if key not in function_summaries:
+        params = [FreshConst(sort, prefix=name) for sort in arg_sorts]
+        precondition, effect = build(*params, *consts)
+        function_summaries[key] = (params, precondition, effect)
+    return function_summaries[key]
+
+def instantiate(name, args, build, consts=()):
+    """Instantiate the summary of `name` with the actual arguments of a call site."""
+    params, precondition, effect = summarize(name, [arg.sort() for arg in args], build, consts)
+    pairs = list(zip(params, args))
+    return substitute(precondition, *pairs), substitute(effect, *pairs)
+
+def constants(exprs):
+    """Uninterpreted constants of `exprs` in left-to-right order of appearance."""
+    consts, seen = [], set()
+    for expr in exprs:
+        todo = [expr]
+        while todo:
+            e = todo.pop()
+            if e.get_id() in seen:
+                continue
+            seen.add(e.get_id())
+            if is_const(e) and e.decl().kind() == Z3_OP_UNINTERPRETED:
+                consts.append(e)
+            elif is_app(e):
+                todo.extend(reversed(e.children()))
+    return consts
+
+def check_precondition(solver, precondition):
+    """Return a model violating an instantiated precondition, or None if it holds."""
+    goal = Not(precondition)
+    solver.push()
+    solver.add(goal)
+    key = None
+    if not isinstance(solver, SlicingSolver):
+        context = list(solver.assertions())
+    elif solver.unsat_depth is None:
+        context = solver.slice()
+    else:
+        context = None  # A stack already proven unsat answers unsat whatever the slice.
+    if context is not None:
+        # Rename the constants of the surrounding facts (usually a few small
+        # assertions); the precondition itself is renamed by substitute().
+        # Constants only the precondition mentions keep their names, which
+        # makes the key stricter but never wrong.
+        context = [c for c in context if not c.eq(goal)]
+        consts = constants(context)
+        pairs = [(v, Const(f"v!{i}", v.sort())) for i, v in enumerate(consts)]
+        renamed = [substitute(c, *pairs) for c in [goal] + context] if pairs else [goal] + context
+        # The renamed expressions are kept in the cache, so their ids stay unique.
+        key = tuple(c.get_id() for c in renamed)
+    if key in precondition_verdicts:
+        values = precondition_verdicts[key][0]
+        model = None
+        if values is not None:
+            # Same question up to renaming: rebuild the model for these constants.
+            model = ModelRef(Z3_mk_model(solver.ctx.ref()), solver.ctx)
+            for v, value in zip(consts, values):
+                model.update_value(v, value)
+    else:
+        model = solver.model() if solver.check() == sat else None
+        if key is not None:
+            values = None if model is None else [model.eval(v, model_completion=True) for v in consts]
+            precondition_verdicts[key] = (values, renamed)
+    solver.pop()
+    return model
 
 def analyze_program_with_functions():
-    solver = Solver()
+    # Summaries and verdicts are scoped to one analysis run
+    function_summaries.clear()
+    precondition_verdicts.clear()
+    solver = SlicingSolver()  # Each check only sees assertions it depends on
     
     # Example 1: Division by zero detection across function calls
     def division_by_zero_analysis():
@@ -10,12 +105,11 @@ def analyze_program_with_functions():
         
         # Function: divide(a, b) returns a/b
         def divide(a, b):
-            solver.push()
-            solver.add(b == 0)  # Check if denominator can be zero
-            if solver.check() == sat:
+            # Summary: requires b != 0, returns a / b
+            precondition, result = instantiate("divide", [a, b], lambda a, b: (b != 0, a / b))
+            if check_precondition(solver, precondition) is not None:
                 print(f"⚠️ Division by zero in divide({a}, {b}) when {b} = 0")
-            solver.pop()
-            return a / b
+            return result
         
         # Test case
         solver.add(x > 5)
@@ -38,13 +132,15 @@ def analyze_program_with_functions():
         
         # Function: get_element(arr, i) returns arr[i]
         def get_element(array, i):
-            solver.push()
-            solver.add(Or(i < 0, i >= arr_size))  # Check OOB access
-            if solver.check() == sat:
-                m = solver.model()
+            # Summary: requires 0 <= i < arr_size, returns array[i]
+            precondition, element = instantiate(
+                "get_element", [array, i],
+                lambda array, i, size: (And(i >= 0, i < size), array[i]),
+                consts=(arr_size,))
+            m = check_precondition(solver, precondition)
+            if m is not None:
                 print(f"⚠️ Array OOB in get_element(arr, {i}) when i = {m[i]}")
-            solver.pop()
-            return array[i]
+            return element
         
         # Nested function call
         def process_array(idx1, idx2):
@@ -68,12 +164,12 @@ def analyze_program_with_functions():
         
         # Function with assertion
         def validate_positive(x):
-            solver.push()
-            solver.add(x <= 0)  # Check assertion violation
-            if solver.check() == sat:
-                print(f"⚠️ Assertion failed in validate_positive({x}) when x = {solver.model()[x]}")
-            solver.pop()
-            return x > 0
+            # Summary: asserts x > 0, returns the asserted condition
+            precondition, valid = instantiate("validate_positive", [x], lambda x: (x > 0, x > 0))
+            m = check_precondition(solver, precondition)
+            if m is not None:
+                print(f"⚠️ Assertion failed in validate_positive({x}) when x = {m[x]}")
+            return valid
         
         # Calling function
         def process_values(x, y):
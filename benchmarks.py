@@ -0,0 +1,263 @@
+from z3 import *
+import argparse
+import contextlib
+import csv
+import io
+import json
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import AdvancedMemory as memory
+import AdvancedRecursion as recursion
+import ConstratintsWithFunctions as functions
+from slicing import SlicingSolver
+from solvers import make_solver
+
+# =============================================
+# Scaling Benchmarks for the Bug-Detection Checkers
+# =============================================
+# Parameterized generators grow the fixed scenarios of the checker scripts:
+#
+#   memory:     N allocations, a random subset freed, random accesses checked
+#               with every check_* routine of AdvancedMemory.py
+#   recursion:  factorial/fibonacci models unrolled to depth D, checked with
+#               every check_* routine of AdvancedRecursion.py
+#   functions:  a call chain of length L reached from K call sites, checked
+#               through the function summaries of ConstratintsWithFunctions.py
+#               (verdicts_solved counts the call sites that reached the solver)
+#
+# Every check_* call is timed. Each size runs in its own worker process so
+# peak memory (process RSS and Z3's "max memory") belongs to that size only.
+# Results are written as JSON and optionally CSV, one row per
+# (generator, size, checker).
+
+# Z3 statistics summed over all calls of a checker ("max memory" is maxed).
+STAT_KEYS = ["conflicts", "decisions", "propagations", "mk clause", "added eqs", "arith conflicts"]
+
+
+def solver_stats(solver):
+    stats = solver.statistics()
+    return {key: stats.get_key_value(key) for key in stats.keys()}
+
+
+class Recorder:
+    """Accumulates timings, verdicts and Z3 statistics per checker routine."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def call(self, solver, fn, *args):
+        row = self.rows.setdefault(fn.__name__, {
+            "checker": fn.__name__, "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "z3_max_memory_mb": 0.0, **{k: 0 for k in STAT_KEYS}})
+        before = solver_stats(solver)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn(solver, *args)
+        elapsed = (time.perf_counter() - start) * 1000
+        row["calls"] += 1
+        row["total_ms"] += elapsed
+        row["max_ms"] = max(row["max_ms"], elapsed)
+        after = solver_stats(solver)
+        for key in STAT_KEYS:
+            # Z3 counters accumulate over a solver's checks, so add only this
+            # call's share. A counter that went down was reset by Z3.
+            value = after.get(key, 0)
+            row[key] += value - before.get(key, 0) if value >= before.get(key, 0) else value
+        if "max memory" in after:
+            row["z3_max_memory_mb"] = max(row["z3_max_memory_mb"], after["max memory"])
+        return result
+
+    def results(self):
+        for row in self.rows.values():
+            row["mean_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+        return list(self.rows.values())
+
+
+# ---------------------------------------------
+# Generators
+# ---------------------------------------------
+def bench_memory(n, rng, recorder, accesses=None):
+    """N allocations with random sizes; about a third freed; random accesses."""
+    solver = SlicingSolver()
+    accesses = accesses or n
+    blocks = []
+    base = 1  # keep address 0 as the null pointer
+    for i in range(n):
+        size = rng.randint(1, 16)
+        blocks.append((base, size))
+        base += size
+    limit = base
+    freed = set(rng.sample(range(n), n // 3))
+    for i, (addr, size) in enumerate(blocks):
+        solver.add(memory.free_memory(addr) if i in freed else memory.allocate_memory(addr, size, limit))
+
+    for j in range(accesses):
+        addr, size = rng.choice(blocks)
+        p = Int(f"p{j}")
+        access = Int(f"access{j}")
+        solver.push()
+        solver.add(p == addr, access == rng.randint(1, size + 4))
+        recorder.call(solver, memory.check_null_pointer, p)
+        recorder.call(solver, memory.check_use_after_free, p)
+        recorder.call(solver, memory.check_buffer_overflow, p, access)
+        recorder.call(solver, memory.check_double_free, p)
+        solver.pop()
+
+    # One fully symbolic pointer ranging over the whole heap.
+    p = Int("p_any")
+    access = Int("access_any")
+    solver.push()
+    solver.add(p >= 0, p < limit, access >= 1)
+    recorder.call(solver, memory.check_buffer_overflow, p, access)
+    recorder.call(solver, memory.check_use_after_free, p)
+    solver.pop()
+
+
+def unrolled_factorial(depth):
+    """Factorial unrolled D levels: returns constraints over n, depth."""
+    n, d = Int("n"), Int("depth")
+    ns = [Int(f"n_{i}") for i in range(depth + 1)]
+    fs = [Int(f"fact_{i}") for i in range(depth + 1)]
+    cs = [ns[0] == n, fs[depth] == If(ns[depth] <= 0, 1, ns[depth])]
+    for i in range(depth):
+        cs.append(ns[i + 1] == ns[i] - 1)
+        cs.append(fs[i] == If(ns[i] <= 0, 1, ns[i] * fs[i + 1]))
+    # Depth actually reached: number of unrolled levels still in the recursive case.
+    cs.append(d == Sum([If(ns[i] > 0, 1, 0) for i in range(depth + 1)]))
+    return And(cs)
+
+
+def unrolled_fibonacci(depth):
+    """Fibonacci call counts unrolled D levels: returns constraints over n, calls."""
+    n, calls = Int("n"), Int("calls")
+    cs = [Int(f"c_{i}") for i in range(depth + 2)]
+    constraints = [cs[depth] == 1, cs[depth + 1] == 1]
+    for i in range(depth):
+        constraints.append(cs[i] == If(n - i <= 1, 1, 1 + cs[i + 1] + cs[i + 2]))
+    constraints.append(calls == cs[0])
+    return And(constraints)
+
+
+def bench_recursion(depth, rng, recorder):
+    """Recursion models unrolled to depth D."""
+    solver = make_solver()
+    n, d = Int("n"), Int("depth")
+    factorial = unrolled_factorial(depth)
+    recorder.call(solver, recursion.check_infinite_recursion, "factorial",
+                  And(factorial, n >= 0), depth - 1)
+    recorder.call(solver, recursion.check_missing_base_case, "factorial",
+                  And(factorial, n < 0, d > 0))
+    recorder.call(solver, recursion.check_stack_overflow_risk, "factorial",
+                  And(factorial, n >= 0), depth)
+    recorder.call(solver, recursion.check_exponential_growth, "fibonacci",
+                  unrolled_fibonacci(depth))
+
+
+def bench_functions(length, rng, recorder, sites=None):
+    """A call chain f1 -> f2 -> ... -> fL ending in a division, called from K sites."""
+    sites = sites or 10 * length
+    functions.function_summaries.clear()
+    functions.precondition_verdicts.clear()
+    solver = make_solver()
+
+    def builder(j):
+        # f_j(x) calls f_{j+1}(x - c_j); the last function divides by x.
+        step = rng.randint(0, 3)
+        if j == length:
+            return lambda x: (x != 0, 100 / x)
+        return lambda x: functions.instantiate(f"f{j + 1}", [x - step], builder(j + 1))
+
+    build_first = builder(1)
+    for k in range(sites):
+        x = Int(f"arg{k}")
+        solver.push()
+        solver.add(x == rng.randint(-length, 4 * length))
+        precondition, _ = functions.instantiate("f1", [x], build_first)
+        recorder.call(solver, functions.check_precondition, precondition)
+        solver.pop()
+    row = recorder.rows["check_precondition"]
+    row["summaries_built"] = len(functions.function_summaries)
+    row["verdicts_solved"] = len(functions.precondition_verdicts)
+
+
+GENERATORS = {
+    "memory": bench_memory,
+    "recursion": bench_recursion,
+    "functions": bench_functions,
+}
+
+DEFAULT_SIZES = {
+    "memory": [10, 50, 100, 200],
+    "recursion": [5, 10, 20, 40],
+    "functions": [5, 10, 20, 40],
+}
+
+
+def run_size(generator, size, seed):
+    """Run one generator at one size; executed in a fresh worker process."""
+    recorder = Recorder()
+    start = time.perf_counter()
+    GENERATORS[generator](size, random.Random(seed), recorder)
+    wall = (time.perf_counter() - start) * 1000
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024
+    rows = recorder.results()
+    for row in rows:
+        row.update({"generator": generator, "size": size, "seed": seed,
+                    "wall_ms": wall, "peak_rss_kb": peak_kb})
+    return rows
+
+
+def run_benchmarks(generators, sizes=None, seed=0, jobs=1):
+    """Return result rows for every generator and size."""
+    tasks = [(g, size) for g in generators for size in (sizes or DEFAULT_SIZES[g])]
+    # One task per process so every size starts from a clean peak RSS.
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as executor:
+        futures = [executor.submit(run_size, g, size, seed) for g, size in tasks]
+        return [row for f in futures for row in f.result()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for the Z3 bug-detection checkers.")
+    parser.add_argument("generators", nargs="*", metavar="GENERATOR",
+                        help=f"generators to run: {', '.join(GENERATORS)} (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="sizes (N, D or L) to run for every generator (default: per generator)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="sizes run in parallel (timings are noisier above 1)")
+    parser.add_argument("--out", default="bench_output.json", help="JSON results file")
+    parser.add_argument("--csv", help="also write results as CSV")
+    args = parser.parse_args(argv)
+
+    generators = args.generators or list(GENERATORS)
+    unknown_generators = [g for g in generators if g not in GENERATORS]
+    if unknown_generators:
+        parser.error(f"unknown generator(s): {', '.join(unknown_generators)}")
+
+    rows = run_benchmarks(generators, args.sizes, args.seed, args.jobs)
+    with open(args.out, "w") as f:
+        json.dump(rows, f, indent=2)
+    if args.csv:
+        fields = ["generator", "size", "checker", "calls", "total_ms", "mean_ms", "max_ms",
+                  "wall_ms", "peak_rss_kb", "z3_max_memory_mb"] + STAT_KEYS + ["summaries_built", "verdicts_solved", "seed"]
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+
+    print(f"{'generator':<10} {'size':>6} {'checker':<28} {'calls':>6} {'mean ms':>9} {'max ms':>9} {'rss MB':>8}")
+    for row in rows:
+        print(f"{row['generator']:<10} {row['size']:>6} {row['checker']:<28} {row['calls']:>6} "
+              f"{row['mean_ms']:>9.2f} {row['max_ms']:>9.2f} {row['peak_rss_kb'] / 1024:>8.1f}")
+    print(f"\nResults written to {args.out}" + (f" and {args.csv}" if args.csv else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
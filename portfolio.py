@@ -0,0 +1,169 @@
+from z3 import *
+from z3.z3util import get_vars
+import multiprocessing
+import os
+import queue
+import time
+
+# =============================================
+# Parallel Portfolio Solving
+# =============================================
+# Races several solver configurations on the same query in separate
+# processes and keeps the first definite (sat/unsat) answer; the other
+# processes are terminated. Different queries favor different setups: the
+# nonlinear recursion checks, symbolic-size buffer overflows and large
+# scheduling instances each have a different winner.
+#
+# The portfolio is enabled for every solver created by solvers.make_solver()
+# (see solvers.enable_portfolio, `z3tools --portfolio`). A query is first
+# tried locally for QUICK_MS; only queries still open after that are raced,
+# so cheap checks never pay for starting processes.
+#
+# The caller's solver is never pushed or re-checked: the quick attempt and
+# the rebuild of the winner's model run on fresh copies of its assertions,
+# so the caller keeps Z3's non-incremental solver for its own checks.
+# Workers are started with forkserver (or spawn), never fork, because the
+# solver pool and scheduling service call this from threads.
+
+QUICK_MS = 200
+# Bound for re-solving locally with the winner's constants pinned.
+PINNED_MS = 1000
+# How often race() checks for workers that died without reporting.
+POLL_S = 0.1
+
+# Each configuration may set global Z3 params, a tactic pipeline (run as a
+# solver), or a logic for SolverFor. Configurations that do not apply to a
+# query simply return unknown and lose the race.
+DEFAULT_PORTFOLIO = [
+    {"name": "smt"},
+    {"name": "smt-seed-1", "params": {"smt.random_seed": 1, "sat.random_seed": 1}},
+    {"name": "arith-solver-2", "params": {"smt.arith.solver": 2}},
+    {"name": "qfnia", "tactic": ["qfnia"]},
+    {"name": "lia-sat-core",
+     "tactic": ["simplify", "normalize-bounds", "lia2pb", "pb2bv", "bit-blast", "sat"]},
+    {"name": "smt-seed-2", "params": {"smt.random_seed": 2, "sat.random_seed": 2}},
+    {"name": "logic-QF_UFLIA", "logic": "QF_UFLIA"},
+]
+
+
+def config_solver(config):
+    """Build the solver described by a portfolio configuration."""
+    for key, value in config.get("params", {}).items():
+        set_param(key, value)
+    if "tactic" in config:
+        return Then(*config["tactic"]).solver() if len(config["tactic"]) > 1 \
+            else Tactic(config["tactic"][0]).solver()
+    if "logic" in config:
+        return SolverFor(config["logic"])
+    return Solver()
+
+
+def run_config(config, smt2, timeout_ms, results):
+    """Worker process: solve `smt2` with one configuration and report back."""
+    try:
+        solver = config_solver(config)
+        if timeout_ms is not None:
+            solver.set("timeout", timeout_ms)
+        solver.from_string(smt2)
+        result = solver.check()
+        model = []
+        if result == sat:
+            m = solver.model()
+            model = [(d.name(), m[d].sexpr()) for d in m.decls() if d.arity() == 0]
+        results.put((str(result), config["name"], model))
+    except Exception:
+        results.put(("unknown", config["name"], []))
+
+
+def race(smt2, configs=None, timeout_ms=None):
+    """
+    Solve `smt2` with every configuration in parallel. Return (verdict,
+    winning configuration name, model constants as (name, value sexpr)).
+    """
+    configs = configs or DEFAULT_PORTFOLIO
+    configs = configs[:max(2, os.cpu_count() or 1)]
+    methods = multiprocessing.get_all_start_methods()
+    mp = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    results = mp.Queue()
+    procs = [mp.Process(target=run_config, args=(c, smt2, timeout_ms, results), daemon=True)
+             for c in configs]
+    for p in procs:
+        p.start()
+
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    answer = ("unknown", None, [])
+    received = 0
+    try:
+        while True:
+            # A worker that crashed (segfault, OOM kill) never reports, so
+            # wait in short steps and stop once every worker is accounted for.
+            lost = sum(1 for p in procs if p.exitcode not in (None, 0))
+            if received + lost >= len(procs):
+                break
+            wait = POLL_S if deadline is None else min(POLL_S, deadline - time.monotonic())
+            if wait <= 0:
+                break
+            try:
+                item = results.get(timeout=wait)
+            except queue.Empty:
+                continue
+            received += 1
+            if item[0] in ("sat", "unsat"):
+                answer = item
+                break
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+    return answer
+
+
+def copy_solver(solver, assumptions=(), timeout_ms=None):
+    """A fresh solver in `solver`'s context holding its assertions and `assumptions`."""
+    copy = Solver(ctx=solver.ctx)
+    copy.add(solver.assertions())
+    copy.add(*assumptions)
+    if timeout_ms is not None:
+        copy.set("timeout", timeout_ms)
+    return copy
+
+
+def check(solver, assumptions, configs=None, quick_ms=None, timeout_ms=None):
+    """
+    Check `solver` (a z3 Solver) with a portfolio. Return (result, model):
+    model is a z3 ModelRef in `solver`'s context when result is sat.
+    """
+    # Quick local attempt first.
+    quick_ms = QUICK_MS if quick_ms is None else quick_ms
+    quick = copy_solver(solver, assumptions, quick_ms if timeout_ms is None else min(quick_ms, timeout_ms))
+    result = quick.check()
+    if result != unknown:
+        return result, quick.model() if result == sat else None
+
+    verdict, _, values = race(quick.to_smt2(), configs, timeout_ms)
+    if verdict == "unsat":
+        return unsat, None
+    if verdict != "sat":
+        return unknown, None
+
+    # Rebuild the winner's model locally: pinning every constant to the
+    # winner's value leaves only function interpretations to find.
+    consts = {v.decl().name(): v for v in get_vars(And(quick.assertions()))} \
+        if quick.assertions() else {}
+    pins = []
+    for name, value in values:
+        if name in consts:
+            v = consts[name]
+            pins.extend(parse_smt2_string(f"(assert (= {v.sexpr()} {value}))",
+                                          decls={v.sexpr(): v}, ctx=solver.ctx))
+    pinned = copy_solver(quick, pins, PINNED_MS if timeout_ms is None else min(PINNED_MS, timeout_ms))
+    if pinned.check() == sat:
+        return sat, pinned.model()
+    # The pins did not carry over in time: keep the winner's verdict, with a
+    # model holding the winner's constant values.
+    model = ModelRef(Z3_mk_model(solver.ctx.ref()), solver.ctx)
+    for pin in pins:
+        model.update_value(pin.arg(0), pin.arg(1))
+    return sat, model
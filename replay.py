@@ -0,0 +1,148 @@
+from z3 import *
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from solvers import INDEX_FILE
+
+# =============================================
+# Offline Replay of Captured Queries
+# =============================================
+# Re-solves a corpus written by query capture (see solvers.py) under several
+# Z3 parameter sets in parallel worker processes, and reports per query:
+#
+#   - verdict differences against the captured verdict or between sets
+#   - sets that returned unknown where another set found an answer
+#   - time of each set, flagged when slower than the first set by --slowdown
+#
+# Useful to tune solver settings and to catch regressions after a Z3 upgrade
+# without rerunning the scripts that produced the queries.
+
+# Parameter sets compared when --params is not given. The first one is the
+# baseline for slowdown reporting.
+DEFAULT_PARAM_SETS = {
+    "default": {},
+    "arith-solver-2": {"smt.arith.solver": 2},
+    "random-seed-7": {"smt.random_seed": 7, "sat.random_seed": 7},
+    "no-relevancy": {"smt.relevancy": 0},
+}
+
+
+def load_corpus(directory):
+    """Return the metadata entries of a captured corpus, in capture order."""
+    with open(os.path.join(directory, INDEX_FILE)) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def solve_entry(directory, entry, set_name, params, timeout_ms):
+    """Solve one captured query under `params`; runs in a worker process."""
+    reset_params()
+    for key, value in params.items():
+        set_param(key, value)
+    with gzip.open(os.path.join(directory, entry["file"]), "rt") as f:
+        text = f.read()
+    solver = Solver()
+    solver.set("timeout", timeout_ms)
+    solver.from_string(text)
+    start = time.perf_counter()
+    result = solver.check()
+    elapsed = (time.perf_counter() - start) * 1000
+    return {
+        "file": entry["file"],
+        "set": set_name,
+        "verdict": str(result),
+        "time_ms": round(elapsed, 3),
+        "reason": solver.reason_unknown() if result == unknown else None,
+    }
+
+
+def replay_corpus(directory, param_sets=None, jobs=None, timeout_ms=60000):
+    """Re-solve every query of the corpus under every parameter set."""
+    param_sets = param_sets or DEFAULT_PARAM_SETS
+    entries = load_corpus(directory)
+    tasks = [(directory, entry, name, params, timeout_ms)
+             for entry in entries for name, params in param_sets.items()]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(solve_entry, *zip(*tasks))) if tasks else []
+
+    by_file = {}
+    for r in results:
+        by_file.setdefault(r["file"], {})[r["set"]] = r
+    return entries, by_file
+
+
+def compare(entries, by_file, param_sets, slowdown=2.0, min_ms=1.0):
+    """Return report rows with verdict differences and slowdowns flagged."""
+    baseline = next(iter(param_sets))
+    rows = []
+    for entry in entries:
+        runs = by_file[entry["file"]]
+        verdicts = {runs[name]["verdict"] for name in param_sets}
+        definite = verdicts - {"unknown"}
+        flags = []
+        if len(definite) > 1 or (definite and entry["verdict"] != "unknown"
+                                 and entry["verdict"] not in definite):
+            flags.append("VERDICT")
+        gave_up = [name for name in param_sets if runs[name]["verdict"] == "unknown"]
+        if gave_up and definite:
+            flags.append("UNKNOWN:" + ",".join(gave_up))
+        base_ms = runs[baseline]["time_ms"]
+        slow = [name for name in param_sets
+                if runs[name]["time_ms"] >= min_ms and runs[name]["time_ms"] > slowdown * base_ms]
+        if slow:
+            flags.append("SLOW:" + ",".join(slow))
+        rows.append({"entry": entry, "runs": runs, "flags": flags})
+    return rows
+
+
+def print_report(rows, param_sets):
+    names = list(param_sets)
+    header = f"{'origin':<28} {'captured':<8} " + " ".join(f"{n[:16]:>16}" for n in names)
+    print(header)
+    print("-" * len(header))
+    totals = dict.fromkeys(names, 0.0)
+    for row in rows:
+        entry, runs = row["entry"], row["runs"]
+        cells = []
+        for n in names:
+            totals[n] += runs[n]["time_ms"]
+            cells.append(f"{runs[n]['verdict'] + ' ' + format(runs[n]['time_ms'], '.1f'):>16}")
+        flags = ("  ⚠️ " + " ".join(row["flags"])) if row["flags"] else ""
+        print(f"{entry['origin'][:28]:<28} {entry['verdict']:<8} " + " ".join(cells) + flags)
+    print("-" * len(header))
+    print(f"{'total ms':<37} " + " ".join(f"{totals[n]:>16.1f}" for n in names))
+    differing = sum(1 for row in rows if "VERDICT" in row["flags"])
+    print(f"\n{len(rows)} queries replayed, {differing} with verdict differences")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a captured SMT-LIB query corpus across Z3 parameter sets.")
+    parser.add_argument("corpus", help="capture directory (containing index.jsonl)")
+    parser.add_argument("--params", help="JSON file mapping set name -> {z3 param: value}")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=int, default=60000, help="per-query timeout in ms")
+    parser.add_argument("--slowdown", type=float, default=2.0,
+                        help="flag sets slower than the first set by this factor")
+    parser.add_argument("--json", dest="json_out", help="also write the full results to this JSON file")
+    args = parser.parse_args(argv)
+
+    param_sets = DEFAULT_PARAM_SETS
+    if args.params:
+        with open(args.params) as f:
+            param_sets = json.load(f)
+
+    entries, by_file = replay_corpus(args.corpus, param_sets, args.jobs, args.timeout)
+    rows = compare(entries, by_file, param_sets, args.slowdown)
+    print_report(rows, param_sets)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 1 if any("VERDICT" in row["flags"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
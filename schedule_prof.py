@@ -1,4 +1,5 @@
 from z3 import *
+from solvers import make_solver
 
 # -------------------------------
 # 1. Define the Problem Domain
@@ -25,51 +26,80 @@ num_rooms = 3
 # 2. Set Up Z3 Variables & Solver
 # -------------------------------
 
-solver = Solver()
+def add_catalog_constraints(solver, courses, num_slots, num_rooms):
+    """
+    Add the scheduling problem to `solver` (in the solver's own context) and
+    return (course_slots, course_rooms).
+    """
+    ctx = solver.ctx
 
-# Create an integer variable for each course representing its time slot.
-course_slots = {course: Int(course) for course in courses}
-# Create an integer variable for each course representing its assigned room.
-course_rooms = {course: Int("room_" + course) for course in courses}
+    # Create an integer variable for each course representing its time slot.
+    course_slots = {course: Int(course, ctx) for course in courses}
+    # Create an integer variable for each course representing its assigned room.
+    course_rooms = {course: Int("room_" + course, ctx) for course in courses}
 
-# Each course must be assigned a time slot between 0 and num_slots-1.
-for course, slot_var in course_slots.items():
-    solver.add(slot_var >= 0, slot_var < num_slots)
+    # Each course must be assigned a time slot between 0 and num_slots-1.
+    for course, slot_var in course_slots.items():
+        solver.add(slot_var >= 0, slot_var < num_slots)
 
-# Each course must be assigned a room between 0 and num_rooms-1.
-for course, room_var in course_rooms.items():
-    solver.add(room_var >= 0, room_var < num_rooms)
+    # Each course must be assigned a room between 0 and num_rooms-1.
+    for course, room_var in course_rooms.items():
+        solver.add(room_var >= 0, room_var < num_rooms)
 
-# -------------------------------
-# 3. Encode Scheduling Constraints
-# -------------------------------
+    # -------------------------------
+    # 3. Encode Scheduling Constraints
+    # -------------------------------
+
+    # Constraint 1: If two courses are taught by the same professor,
+    # they cannot be scheduled at the same time.
+    for course1 in courses:
+        for course2 in courses:
+            if course1 < course2 and courses[course1] == courses[course2]:
+                solver.add(course_slots[course1] != course_slots[course2])
+
+    # Constraint 2: If two courses are scheduled at the same time,
+    # they cannot be assigned the same room.
+    for course1 in courses:
+        for course2 in courses:
+            if course1 < course2:
+                solver.add(Implies(course_slots[course1] == course_slots[course2],
+                                    course_rooms[course1] != course_rooms[course2]))
 
-# Constraint 1: If two courses are taught by the same professor,
-# they cannot be scheduled at the same time.
-for course1 in courses:
-    for course2 in courses:
-        if course1 < course2 and courses[course1] == courses[course2]:
-            solver.add(course_slots[course1] != course_slots[course2])
-
-# Constraint 2: If two courses are scheduled at the same time,
-# they cannot be assigned the same room.
-for course1 in courses:
-    for course2 in courses:
-        if course1 < course2:
-            solver.add(Implies(course_slots[course1] == course_slots[course2],
-                                course_rooms[course1] != course_rooms[course2]))
+    return course_slots, course_rooms
+
+def build_solver(courses, num_slots, num_rooms):
+    """Return (solver, course_slots, course_rooms) encoding the scheduling problem."""
+    solver = make_solver()
+    course_slots, course_rooms = add_catalog_constraints(solver, courses, num_slots, num_rooms)
+    return solver, course_slots, course_rooms
 
 # -------------------------------
 # 4. Solve and Display the Schedule
 # -------------------------------
 
-if solver.check() == sat:
+def solve_schedule(courses=courses, num_slots=num_slots, num_rooms=num_rooms, prepared=None):
+    """
+    Return {course: (professor, time_slot, room)}, or None if no schedule exists.
+    `prepared` is an optional (solver, course_slots, course_rooms) that already
+    holds the constraints, e.g. a pooled solver.
+    """
+    solver, course_slots, course_rooms = prepared or build_solver(courses, num_slots, num_rooms)
+    if solver.check() != sat:
+        return None
     model = solver.model()
-    print("Z3-Generated Schedule:")
-    for course in courses:
-        time_slot = model[course_slots[course]]
-        room = model[course_rooms[course]]
-        professor = courses[course]
-        print(f"  {course} (taught by {professor}) -> Time Slot {time_slot}, Room {room}")
-else:
-    print("No valid schedule found.")
+    return {course: (courses[course],
+                     model[course_slots[course]].as_long(),
+                     model[course_rooms[course]].as_long())
+            for course in courses}
+
+def print_schedule(courses=courses, num_slots=num_slots, num_rooms=num_rooms):
+    schedule = solve_schedule(courses, num_slots, num_rooms)
+    if schedule is not None:
+        print("Z3-Generated Schedule:")
+        for course, (professor, time_slot, room) in schedule.items():
+            print(f"  {course} (taught by {professor}) -> Time Slot {time_slot}, Room {room}")
+    else:
+        print("No valid schedule found.")
+
+if __name__ == "__main__":
+    print_schedule()
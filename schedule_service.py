@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from z3 import Context
+
+import schedule_prof
+import schedule_student
+from solver_pool import SolverPool, professor_catalog, student_catalog
+from solvers import make_solver
+
+# =============================================
+# Scheduling Service
+# =============================================
+# An asyncio server (Unix socket or TCP) for the registration portal. Each
+# connection sends one JSON request line and receives JSON lines back:
+#
+#   {"kind": "student", "courses": "EECS4401,MATH1000"}
+#       -> {"schedule": {...}} for every valid schedule, as it is found
+#       -> {"done": true, "count": N}
+#   {"kind": "prof", "slots": 4, "rooms": 3}
+#       -> {"schedule": {...}} once, then {"done": true, "count": 1}
+#   {"kind": "stats"}
+#       -> {"stats": {...}}
+#
+# Solving runs on worker threads, each using a pooled solver with its own
+# Context and the catalog preloaded (solver_pool.py). Identical requests
+# that arrive while one is being solved share that solve: late arrivals
+# replay the schedules found so far and then follow the live stream. New
+# solves wait in a bounded queue; when it stays full for the admission
+# timeout the request is rejected with {"error": "busy"}.
+
+
+class Job:
+    """One in-flight solve, streamed to every request that shares it."""
+
+    def __init__(self, key):
+        self.key = key
+        self.items = []
+        self.done = False
+        # The error reply sent to every subscriber, if the job failed.
+        self.error = None
+        self.changed = asyncio.Condition()
+
+    async def publish(self, item):
+        async with self.changed:
+            self.items.append(item)
+            self.changed.notify_all()
+
+    async def finish(self, error=None):
+        async with self.changed:
+            self.done = True
+            self.error = error
+            self.changed.notify_all()
+
+    async def stream(self):
+        """Yield every item from the start, then new ones until the job is done."""
+        i = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: i < len(self.items) or self.done)
+                batch = self.items[i:]
+                done = self.done
+            for item in batch:
+                yield item
+            i += len(batch)
+            if done and i == len(self.items):
+                return
+
+
+class ScheduleService:
+    def __init__(self, workers=4, queue_size=64, admission_timeout=1.0):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.admission_timeout = admission_timeout
+        self.inflight = {}
+        self.stats = {"requests": 0, "solves": 0, "coalesced": 0, "rejected": 0}
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="z3-solve")
+        # Pools are built on the worker threads' executor so startup does
+        # not block the event loop.
+        self.student_pool, self.prof_pool = await asyncio.gather(
+            self.loop.run_in_executor(self.executor, SolverPool, self.workers, student_catalog),
+            self.loop.run_in_executor(self.executor, SolverPool, self.workers, professor_catalog))
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------------------------------------
+    # Solving
+    # ---------------------------------------------
+    async def worker(self):
+        while True:
+            job, solve = await self.queue.get()
+            self.stats["solves"] += 1
+            try:
+                await self.loop.run_in_executor(self.executor, solve, self.publisher(job))
+                await job.finish()
+            except Exception as e:
+                await job.finish({"error": f"{type(e).__name__}: {e}"})
+            finally:
+                self.inflight.pop(job.key, None)
+                self.queue.task_done()
+
+    def publisher(self, job):
+        """A callback for worker threads that hands each result to the event loop."""
+        def publish(item):
+            asyncio.run_coroutine_threadsafe(job.publish(item), self.loop).result()
+        return publish
+
+    def solve_student(self, selected_courses):
+        def solve(publish):
+            with self.student_pool.solver() as lease:
+                prepared = (lease.solver, *lease.base)
+                for schedule in schedule_student.enumerate_schedules(selected_courses, prepared=prepared):
+                    publish(schedule)
+        return solve
+
+    def solve_prof(self, num_slots, num_rooms):
+        def solve(publish):
+            if (num_slots, num_rooms) == (schedule_prof.num_slots, schedule_prof.num_rooms):
+                with self.prof_pool.solver() as lease:
+                    schedule = schedule_prof.solve_schedule(prepared=(lease.solver, *lease.base))
+            else:
+                # Other sizes are not pooled; solve them in a private Context
+                # since the global one must not be shared between threads.
+                solver = make_solver(ctx=Context())
+                handles = schedule_prof.add_catalog_constraints(
+                    solver, schedule_prof.courses, num_slots, num_rooms)
+                schedule = schedule_prof.solve_schedule(prepared=(solver, *handles))
+            if schedule is not None:
+                publish({course: {"Professor": professor, "Time Slot": slot, "Room": room}
+                         for course, (professor, slot, room) in schedule.items()})
+        return solve
+
+    # ---------------------------------------------
+    # Requests
+    # ---------------------------------------------
+    def plan(self, request):
+        """Return (coalescing key, solve function) for a request, or raise ValueError."""
+        kind = request.get("kind")
+        if kind == "student":
+            courses = request.get("courses", "")
+            if isinstance(courses, list):
+                courses = ",".join(courses)
+            selected, invalid, _ = schedule_student.parse_selection(courses)
+            if invalid:
+                raise ValueError(f"invalid course codes: {', '.join(invalid)}")
+            # The schedule set does not depend on the order courses were listed in.
+            selected = sorted(selected)
+            return ("student", tuple(selected)), self.solve_student(selected)
+        if kind == "prof":
+            num_slots = int(request.get("slots", schedule_prof.num_slots))
+            num_rooms = int(request.get("rooms", schedule_prof.num_rooms))
+            if num_slots < 1 or num_rooms < 1:
+                raise ValueError("slots and rooms must be positive")
+            return ("prof", num_slots, num_rooms), self.solve_prof(num_slots, num_rooms)
+        raise ValueError(f"unknown request kind: {kind!r}")
+
+    def busy(self):
+        return {"error": "busy", "retry_after": self.admission_timeout}
+
+    async def submit(self, request):
+        """Return the Job serving `request`, joining an identical in-flight one."""
+        key, solve = self.plan(request)
+        job = self.inflight.get(key)
+        if job is not None:
+            self.stats["coalesced"] += 1
+            return job
+        job = Job(key)
+        self.inflight[key] = job
+        try:
+            await asyncio.wait_for(self.queue.put((job, solve)), self.admission_timeout)
+        except asyncio.TimeoutError:
+            self.inflight.pop(key, None)
+            # Requests that joined this job meanwhile get the same reply.
+            await job.finish(self.busy())
+            self.stats["rejected"] += 1
+            raise
+        return job
+
+    async def handle(self, reader, writer):
+        async def send(message):
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            self.stats["requests"] += 1
+            try:
+                # readline() raises ValueError for a line over the stream limit.
+                request = json.loads(await reader.readline())
+                if not isinstance(request, dict):
+                    raise ValueError
+            except ValueError:
+                await send({"error": "request must be one JSON object per line"})
+                return
+            if request.get("kind") == "stats":
+                await send({"stats": {**self.stats, "inflight": len(self.inflight),
+                                      "queued": self.queue.qsize()}})
+                return
+            try:
+                job = await self.submit(request)
+            except (TypeError, ValueError) as e:
+                await send({"error": str(e)})
+                return
+            except asyncio.TimeoutError:
+                await send(self.busy())
+                return
+
+            count = 0
+            async for schedule in job.stream():
+                count += 1
+                await send({"schedule": schedule})
+            if job.error is not None:
+                await send(job.error)
+            else:
+                await send({"done": True, "count": count})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(socket_path=None, host="127.0.0.1", port=None, **options):
+    service = ScheduleService(**options)
+    await service.start()
+    if port is not None:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = f"{host}:{port}"
+    else:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(service.handle, socket_path)
+        where = socket_path
+    # Shut down cleanly (removing the socket file) on SIGTERM as well as Ctrl-C.
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+    print(f"schedule service listening on {where}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if port is None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve schedule_prof and schedule_student requests.")
+    parser.add_argument("--socket", default="schedule_service.sock", help="Unix socket path")
+    parser.add_argument("--port", type=int, help="listen on TCP host:port instead of a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (with --port)")
+    parser.add_argument("--workers", type=int, default=4, help="solver threads and pooled solvers per catalog")
+    parser.add_argument("--queue", type=int, default=64, help="maximum solves waiting for a worker")
+    parser.add_argument("--admission-timeout", type=float, default=1.0,
+                        help="seconds to wait for queue space before answering busy")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket, args.host, args.port, workers=args.workers,
+                          queue_size=args.queue, admission_timeout=args.admission_timeout))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
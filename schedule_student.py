@@ -1,4 +1,5 @@
 from z3 import *
+from solvers import make_solver
 import sys
 
 def get_time_slot(var, sections):
@@ -28,94 +29,158 @@ course_sections = {
     "BIOL1000": [("A", 1), ("B", 2), ("C", 4)]
 }
 
-print("Available courses:")
-for course in course_sections:
-    print(f"  {course}")
-
 # -------------------------------
 # 2. Scan Student's Course Selection
 # -------------------------------
-# The student enters a comma-separated list of course codes to consider.
-selected_input = input("Enter the course codes you want to consider (comma separated): ")
-raw_courses = [course.strip() for course in selected_input.split(",")]
+def parse_selection(selected_input, course_sections=course_sections):
+    """
+    Split a comma-separated list of course codes. Return (selected_courses,
+    invalid_courses, truncated): only the first 5 valid codes are kept.
+    """
+    raw_courses = [course.strip() for course in selected_input.split(",")]
+
+    # Check for invalid course codes.
+    invalid_courses = [course for course in raw_courses if course not in course_sections]
 
-# Check for invalid course codes.
-invalid_courses = [course for course in raw_courses if course not in course_sections]
-if invalid_courses:
-    print(f"Error: The following course codes are invalid: {', '.join(invalid_courses)}")
-    sys.exit(1)
+    # Use only valid course codes.
+    selected_courses = raw_courses
 
-# Use only valid course codes.
-selected_courses = raw_courses
+    # If more than 5 courses are provided, only consider the first 5.
+    truncated = len(selected_courses) > 5
+    if truncated:
+        selected_courses = selected_courses[:5]
+    return selected_courses, invalid_courses, truncated
 
-# If more than 5 courses are provided, only consider the first 5.
-if len(selected_courses) > 5:
-    print("You have selected more than 5 courses. Only the first 5 will be considered.")
-    selected_courses = selected_courses[:5]
 
 # -------------------------------
 # 3. Build the Z3 Model
 # -------------------------------
-solver = Solver()
-
-# For each course, create two decision variables:
-# - enroll: a Boolean indicating whether the course is taken.
-# - section_choice: an integer representing the chosen section index.
-enroll = {}
-section_choice = {}
-for course, sections in course_sections.items():
-    enroll[course] = Bool(f"enroll_{course}")
-    section_choice[course] = Int(f"section_{course}")
-    # Constrain the section index to be within the valid range.
-    solver.add(section_choice[course] >= 0, section_choice[course] < len(sections))
+def add_catalog_constraints(solver, course_sections=course_sections, selected_courses=None):
+    """
+    Add the constraints that hold for every student to `solver` (in the
+    solver's own context) and return (enroll, section_choice). With
+    `selected_courses`, the selection is added in between, in the order the
+    script has always used (Z3's search, and so the order schedules are
+    found in, depends on it).
+    """
+    ctx = solver.ctx
+
+    # For each course, create two decision variables:
+    # - enroll: a Boolean indicating whether the course is taken.
+    # - section_choice: an integer representing the chosen section index.
+    enroll = {}
+    section_choice = {}
+    for course, sections in course_sections.items():
+        enroll[course] = Bool(f"enroll_{course}", ctx)
+        section_choice[course] = Int(f"section_{course}", ctx)
+        # Constrain the section index to be within the valid range.
+        solver.add(section_choice[course] >= 0, section_choice[course] < len(sections))
+        # For courses not selected by the student, force enrollment to False.
+        if selected_courses is not None and course not in selected_courses:
+            solver.add(enroll[course] == False)
+
+    # For courses in the student's selection, force enrollment to True.
+    for course in selected_courses or []:
+        solver.add(enroll[course] == True)
+
+    # Constraint: The student can enroll in at most 5 courses.
+    solver.add(Sum([If(enroll[course], 1, 0) for course in course_sections]) <= 5)
+
+    # Constraint: If two courses are both enrolled, their chosen sections must not conflict.
+    all_courses = list(course_sections.keys())
+    for i in range(len(all_courses)):
+        for j in range(i + 1, len(all_courses)):
+            course_i = all_courses[i]
+            course_j = all_courses[j]
+            time_i = get_time_slot(section_choice[course_i], course_sections[course_i])
+            time_j = get_time_slot(section_choice[course_j], course_sections[course_j])
+            solver.add(Or(Not(enroll[course_i]), Not(enroll[course_j]), time_i != time_j))
+
+    return enroll, section_choice
+
+
+def add_selection(solver, enroll, selected_courses):
+    """Force enrollment in exactly the student's selected courses."""
     # For courses not selected by the student, force enrollment to False.
-    if course not in selected_courses:
-        solver.add(enroll[course] == False)
-
-# For courses in the student's selection, force enrollment to True.
-for course in selected_courses:
-    solver.add(enroll[course] == True)
-
-# Constraint: The student can enroll in at most 5 courses.
-solver.add(Sum([If(enroll[course], 1, 0) for course in course_sections]) <= 5)
-
-# Constraint: If two courses are both enrolled, their chosen sections must not conflict.
-all_courses = list(course_sections.keys())
-for i in range(len(all_courses)):
-    for j in range(i + 1, len(all_courses)):
-        course_i = all_courses[i]
-        course_j = all_courses[j]
-        time_i = get_time_slot(section_choice[course_i], course_sections[course_i])
-        time_j = get_time_slot(section_choice[course_j], course_sections[course_j])
-        solver.add(Or(Not(enroll[course_i]), Not(enroll[course_j]), time_i != time_j))
+    for course in enroll:
+        if course not in selected_courses:
+            solver.add(enroll[course] == False)
 
-# -------------------------------
-# 4. Enumerate and Print All Valid Schedules
-# -------------------------------
-print("\nAll valid schedules:")
+    # For courses in the student's selection, force enrollment to True.
+    for course in selected_courses:
+        solver.add(enroll[course] == True)
 
-schedule_count = 0
 
-# We build a blocking clause based only on the effective schedule for the student-selected courses.
-while solver.check() == sat:
-    m = solver.model()
-    current_schedule = {}
-    effective_clauses = []
-    for course in selected_courses:
-        # Enrollment is forced to True for selected courses.
-        chosen_index = m.evaluate(section_choice[course]).as_long()
-        section, time_slot = course_sections[course][chosen_index]
-        current_schedule[course] = {"Section": section, "Time Slot": time_slot}
-        effective_clauses.append(section_choice[course] == m[section_choice[course]])
-
-    schedule_count += 1
-    print(f"\nSchedule #{schedule_count}:")
-    for course, details in current_schedule.items():
-        print(f"  Course: {course} | Section: {details['Section']} | Time Slot: {details['Time Slot']}")
-    total = len(selected_courses)
-    print(f"  Total Enrolled Courses: {total}")
-
-    # Block the current effective schedule.
-    solver.add(Not(And(effective_clauses)))
-
-print(f"\nTotal valid schedules found: {schedule_count}")
\ No newline at end of file
+def build_solver(selected_courses, course_sections=course_sections):
+    """Return (solver, section_choice) for the student's selected courses."""
+    solver = make_solver()
+    _, section_choice = add_catalog_constraints(solver, course_sections, selected_courses)
+    return solver, section_choice
+
+
+# -------------------------------
+# 4. Enumerate All Valid Schedules
+# -------------------------------
+def enumerate_schedules(selected_courses, course_sections=course_sections, prepared=None):
+    """
+    Yield each valid schedule as {course: {"Section": ..., "Time Slot": ...}}.
+    `prepared` is an optional (solver, enroll, section_choice) that already
+    holds the catalog constraints, e.g. a pooled solver; the selection and
+    blocking clauses are added to it.
+    """
+    if prepared is None:
+        solver, section_choice = build_solver(selected_courses, course_sections)
+    else:
+        solver, enroll, section_choice = prepared
+        add_selection(solver, enroll, selected_courses)
+
+    # We build a blocking clause based only on the effective schedule for the student-selected courses.
+    while solver.check() == sat:
+        m = solver.model()
+        current_schedule = {}
+        effective_clauses = []
+        for course in selected_courses:
+            # Enrollment is forced to True for selected courses.
+            chosen_index = m.evaluate(section_choice[course]).as_long()
+            section, time_slot = course_sections[course][chosen_index]
+            current_schedule[course] = {"Section": section, "Time Slot": time_slot}
+            effective_clauses.append(section_choice[course] == m[section_choice[course]])
+
+        yield current_schedule
+
+        # Block the current effective schedule.
+        solver.add(Not(And(effective_clauses)))
+
+
+def main(selected_input=None):
+    print("Available courses:")
+    for course in course_sections:
+        print(f"  {course}")
+
+    # The student enters a comma-separated list of course codes to consider.
+    if selected_input is None:
+        selected_input = input("Enter the course codes you want to consider (comma separated): ")
+    selected_courses, invalid_courses, truncated = parse_selection(selected_input)
+    if invalid_courses:
+        print(f"Error: The following course codes are invalid: {', '.join(invalid_courses)}")
+        return 1
+    if truncated:
+        print("You have selected more than 5 courses. Only the first 5 will be considered.")
+
+    print("\nAll valid schedules:")
+
+    schedule_count = 0
+    for current_schedule in enumerate_schedules(selected_courses):
+        schedule_count += 1
+        print(f"\nSchedule #{schedule_count}:")
+        for course, details in current_schedule.items():
+            print(f"  Course: {course} | Section: {details['Section']} | Time Slot: {details['Time Slot']}")
+        total = len(selected_courses)
+        print(f"  Total Enrolled Courses: {total}")
+
+    print(f"\nTotal valid schedules found: {schedule_count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+from z3 import *
+from solvers import make_solver
+
+# =============================================
+# Cone-of-Influence Slicing
+# =============================================
+# A SlicingSolver is used like a z3 Solver that is shared across several
+# analyses. Instead of sending every accumulated assertion to Z3, each
+# check() sends only the slice that can influence the queried condition:
+#
+#   - the query: every assertion added since the last satisfiable check,
+#     in any frame (or the innermost frame if nothing new was added; the
+#     whole stack if that frame is empty)
+#   - every other assertion connected to the query through shared
+#     uninterpreted symbols (variables, functions, arrays), transitively
+#
+# Assertions left out share no symbols with the slice and were part of an
+# earlier satisfiable slice, so a verdict on the slice is a verdict on the
+# full stack.
+# Once a check without assumptions returns unsat, the stack is known to be
+# unsat and every check answers unsat until the frames involved are popped.
+#
+# Symbols are grouped into connected components with a union-find that is
+# updated as assertions are added and undone on pop(), so a check costs
+# time in the size of its slice, not in the number of assertions made by
+# earlier analyses.
+
+
+def symbols(expr):
+    """Return the names of the uninterpreted constants and functions in `expr`."""
+    found = set()
+    seen = set()
+    todo = [expr]
+    while todo:
+        e = todo.pop()
+        if e.get_id() in seen:
+            continue
+        seen.add(e.get_id())
+        if is_app(e):
+            if e.decl().kind() == Z3_OP_UNINTERPRETED:
+                found.add(e.decl().name())
+            todo.extend(e.children())
+        elif is_quantifier(e):
+            todo.append(e.body())
+    return found
+
+
+class SlicingSolver:
+    """Solver wrapper that checks only the cone of influence of each query."""
+
+    def __init__(self, solver=None):
+        self.solver = solver if solver is not None else make_solver()
+        # Assertions in stack order, as (expr, symbols(expr)).
+        self.entries = []
+        # One entry per push() level: (first entry index, trail length at push).
+        self.frames = [(0, 0)]
+        # Entries below this index were in a slice that was found satisfiable
+        # (or share no symbols with one that was).
+        self.checked = 0
+        # Union-find over symbol names (union by size, no path compression
+        # so that every change can be undone). Each root maps to the indices
+        # of the assertions in its component; closed formulas (no symbols)
+        # are kept apart and belong to every slice.
+        self.parent = {}
+        self.members = {}
+        self.closed = []
+        self.trail = []
+        # Depth at which the stack was proven unsat, if it was.
+        self.unsat_depth = None
+        self.last_model = None
+        self.last_slice = []
+
+    # ---------------------------------------------
+    # Components
+    # ---------------------------------------------
+    def find(self, name):
+        while self.parent[name] != name:
+            name = self.parent[name]
+        return name
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if len(self.members[a]) < len(self.members[b]):
+            a, b = b, a
+        self.trail.append(("union", a, b, len(self.members[a])))
+        self.parent[b] = a
+        self.members[a].extend(self.members.pop(b))
+        return a
+
+    def undo(self, length):
+        while len(self.trail) > length:
+            op = self.trail.pop()
+            if op[0] == "symbol":
+                del self.parent[op[1]]
+                del self.members[op[1]]
+            elif op[0] == "union":
+                _, a, b, size = op
+                self.parent[b] = b
+                self.members[b] = self.members[a][size:]
+                del self.members[a][size:]
+            elif op[0] == "assert":
+                self.members[op[1]].pop()
+            elif op[0] == "closed":
+                self.closed.pop()
+
+    def add(self, *constraints):
+        for c in constraints:
+            if isinstance(c, (list, tuple)):
+                self.add(*c)
+                continue
+            if not is_expr(c):
+                c = BoolVal(c, self.solver.ctx)
+            syms = symbols(c)
+            index = len(self.entries)
+            self.entries.append((c, syms))
+            if not syms:
+                self.closed.append(index)
+                self.trail.append(("closed",))
+                continue
+            for name in syms:
+                if name not in self.parent:
+                    self.parent[name] = name
+                    self.members[name] = []
+                    self.trail.append(("symbol", name))
+            names = iter(syms)
+            root = self.find(next(names))
+            for name in names:
+                root = self.union(root, name)
+            self.members[root].append(index)
+            self.trail.append(("assert", root))
+
+    def push(self):
+        self.frames.append((len(self.entries), len(self.trail)))
+
+    def pop(self, num=1):
+        if num >= len(self.frames):
+            raise Z3Exception("cannot pop the base frame")
+        start, trail = self.frames[-num]
+        del self.frames[-num:]
+        self.undo(trail)
+        del self.entries[start:]
+        self.checked = min(self.checked, start)
+        if self.unsat_depth is not None and len(self.frames) < self.unsat_depth:
+            self.unsat_depth = None
+
+    def assertions(self):
+        return [c for c, _ in self.entries]
+
+    def slice(self, *assumptions):
+        """Return the assertions that can reach the current query, in stack order."""
+        start = self.frames[-1][0]
+        query = range(self.checked, len(self.entries)) or range(start, len(self.entries))
+        if not query:
+            # Nothing to slice on: check the whole stack.
+            return self.assertions()
+        roots = set()
+        for i in query:
+            roots |= {self.find(name) for name in self.entries[i][1]}
+        for a in assumptions:
+            roots |= {self.find(name) for name in symbols(a) if name in self.parent}
+        selected = set(self.closed).union(query)
+        for root in roots:
+            selected.update(self.members[root])
+        return [self.entries[i][0] for i in sorted(selected)]
+
+    def check(self, *assumptions):
+        if self.unsat_depth is not None:
+            self.last_slice = []
+            self.last_model = None
+            return unsat
+        self.last_slice = self.slice(*assumptions)
+        self.solver.push()
+        self.solver.add(self.last_slice)
+        result = self.solver.check(*assumptions)
+        self.last_model = self.solver.model() if result == sat else None
+        self.solver.pop()
+        if result == sat:
+            # Every unchecked entry was in the slice, so all of them now are.
+            self.checked = len(self.entries)
+        if result == unsat and not assumptions:
+            self.unsat_depth = len(self.frames)
+        return result
+
+    def model(self):
+        if self.last_model is None:
+            raise Z3Exception("model is not available")
+        return self.last_model
+
+    def reason_unknown(self):
+        return self.solver.reason_unknown()
+
+    def statistics(self):
+        return self.solver.statistics()
@@ -0,0 +1,93 @@
+from z3 import *
+import contextlib
+import queue
+
+from solvers import make_solver
+
+# =============================================
+# Thread-Safe Solver Pool
+# =============================================
+# Z3 objects are not thread-safe within one Context, and every script uses
+# the global context. A SolverPool holds pre-warmed solvers, each in its own
+# Context, with base constraints (a course catalog, heap model axioms, ...)
+# already asserted. A thread checks one out, adds its query, and returns it;
+# the pool resets it to the base state for the next caller:
+#
+#     pool = SolverPool(4, student_catalog)
+#     with pool.solver() as lease:
+#         enroll, section_choice = lease.base
+#         ...
+#
+# Expressions used with a leased solver must be built in `lease.ctx`
+# (e.g. Int("x", lease.ctx)); the setup functions below do this for the
+# catalogs and the heap model.
+
+
+class Lease:
+    """A pooled solver, its Context, and whatever the setup function returned."""
+
+    def __init__(self, solver, ctx, base):
+        self.solver = solver
+        self.ctx = ctx
+        self.base = base
+
+    def reset(self):
+        # Base constraints sit below the first scope: popping every scope
+        # and opening a fresh one restores the base state.
+        self.solver.pop(self.solver.num_scopes())
+        self.solver.push()
+
+
+class SolverPool:
+    """A fixed number of solvers with private Contexts, shared between threads."""
+
+    def __init__(self, size, setup=None):
+        """`setup(solver)` adds the base constraints and returns handles to them."""
+        self.size = size
+        self.available = queue.Queue()
+        for _ in range(size):
+            ctx = Context()
+            solver = make_solver(ctx=ctx)
+            base = setup(solver) if setup is not None else None
+            # Warm the solver up on the base constraints once.
+            solver.check()
+            solver.push()
+            self.available.put(Lease(solver, ctx, base))
+
+    @contextlib.contextmanager
+    def solver(self, timeout=None):
+        """Check out a solver (waiting up to `timeout` seconds); reset it on return."""
+        lease = self.available.get(timeout=timeout)
+        try:
+            yield lease
+        finally:
+            lease.reset()
+            self.available.put(lease)
+
+
+# ---------------------------------------------
+# Base constraint setups
+# ---------------------------------------------
+def student_catalog(solver):
+    """schedule_student course catalog; base is (enroll, section_choice)."""
+    import schedule_student
+    return schedule_student.add_catalog_constraints(solver)
+
+
+def professor_catalog(solver):
+    """schedule_prof catalog, slots and rooms; base is (course_slots, course_rooms)."""
+    import schedule_prof
+    return schedule_prof.add_catalog_constraints(
+        solver, schedule_prof.courses, schedule_prof.num_slots, schedule_prof.num_rooms)
+
+
+def heap_model(solver, limit=None):
+    """
+    AdvancedMemory heap model axioms; base is (is_allocated, allocated_size).
+    `limit` must match the one given to allocate_memory(); bind it with
+    functools.partial(heap_model, limit=...) for other heap sizes.
+    """
+    import AdvancedMemory
+    limit = AdvancedMemory.memory_size if limit is None else limit
+    solver.add(AdvancedMemory.heap_axioms(solver.ctx, limit))
+    return AdvancedMemory.heap_model(solver.ctx)
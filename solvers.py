@@ -0,0 +1,152 @@
+from z3 import *
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+
+# =============================================
+# Solver Factory
+# =============================================
+# Every checker and scheduler creates its solvers through make_solver(), so
+# features that apply to all queries live in one place.
+#
+# Query capture: when enabled (start_capture(), `z3tools --capture DIR`, or
+# the Z3TOOLS_CAPTURE environment variable), every check() writes the
+# solver's assertions at that moment to DIR as a gzipped .smt2 file, and
+# appends one metadata line to DIR/index.jsonl naming the function that
+# issued the query (e.g. check_buffer_overflow, enumerate_schedules; for a
+# generic helper such as check_precondition, its caller), its verdict and
+# solve time. replay.py re-solves such a corpus offline.
+#
+# Portfolio solving: when enabled (enable_portfolio(), `z3tools --portfolio`,
+# or the Z3TOOLS_PORTFOLIO environment variable), queries that are not
+# solved quickly are raced across several configurations in parallel
+# processes (see portfolio.py).
+
+CAPTURE_ENV = "Z3TOOLS_CAPTURE"
+PORTFOLIO_ENV = "Z3TOOLS_PORTFOLIO"
+INDEX_FILE = "index.jsonl"
+
+# Modules whose frames are skipped when naming the function that issued a query.
+INFRASTRUCTURE = {"solvers", "slicing", "portfolio"}
+# (module, function) of generic helpers that check on behalf of their caller;
+# they stay in the recorded stack, but the caller is named as the origin.
+HELPERS = {
+    ("ConstratintsWithFunctions", "check_precondition"),
+    ("source_checker", "query"),
+    ("source_checker", "unreachable"),
+}
+
+capture_dir = os.environ.get(CAPTURE_ENV) or None
+# None when disabled, otherwise the portfolio configurations (or [] for the defaults).
+portfolio_configs = [] if os.environ.get(PORTFOLIO_ENV) else None
+
+
+def start_capture(directory):
+    """Capture every query from now on into `directory` (also in child processes)."""
+    global capture_dir
+    os.makedirs(directory, exist_ok=True)
+    capture_dir = directory
+    os.environ[CAPTURE_ENV] = directory
+
+
+def stop_capture():
+    global capture_dir
+    capture_dir = None
+    os.environ.pop(CAPTURE_ENV, None)
+
+
+def enable_portfolio(configs=None):
+    """Race hard queries across `configs` (default: portfolio.DEFAULT_PORTFOLIO)."""
+    global portfolio_configs
+    portfolio_configs = list(configs or [])
+    os.environ[PORTFOLIO_ENV] = "1"
+
+
+def disable_portfolio():
+    global portfolio_configs
+    portfolio_configs = None
+    os.environ.pop(PORTFOLIO_ENV, None)
+
+
+def query_origin():
+    """Return the call stack (innermost first) of the code that issued a check()."""
+    frame = sys._getframe(1)
+    stack = []
+    while frame is not None and len(stack) < 4:
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        if module not in INFRASTRUCTURE and module != "z3":
+            stack.append({"function": frame.f_code.co_name, "module": module,
+                          "line": frame.f_lineno})
+        frame = frame.f_back
+    return stack
+
+
+def record_query(solver, assumptions, result, elapsed):
+    stack = query_origin()
+    callers = [f for f in stack if (f["module"], f["function"]) not in HELPERS] or stack
+    origin = callers[0]["function"] if callers else "<unknown>"
+    # Random names stay unique across runs and worker processes; capture
+    # order is kept by index.jsonl.
+    name = f"{uuid.uuid4().hex[:12]}-{origin.strip('<>')}.smt2.gz"
+
+    # Assumptions passed to check() are recorded as ordinary assertions.
+    snapshot = Solver(ctx=solver.ctx)
+    snapshot.add(solver.assertions())
+    snapshot.add(*assumptions)
+    with gzip.open(os.path.join(capture_dir, name), "wt") as f:
+        f.write(snapshot.to_smt2())
+
+    entry = {
+        "file": name,
+        "origin": origin,
+        "stack": stack,
+        "verdict": str(result),
+        "time_ms": round(elapsed * 1000, 3),
+        "assertions": len(snapshot.assertions()),
+        "z3_version": get_version_string(),
+    }
+    with open(os.path.join(capture_dir, INDEX_FILE), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+class ToolSolver(Solver):
+    """A z3 Solver whose check() goes through the shared query hooks."""
+
+    def __init__(self, ctx=None):
+        Solver.__init__(self, ctx=ctx)
+        self.timeout_ms = None
+        self.portfolio_model = None
+
+    def set(self, *args, **keys):
+        # Remember the timeout so the portfolio can respect it.
+        if len(args) == 2 and args[0] == "timeout":
+            self.timeout_ms = args[1]
+        if "timeout" in keys:
+            self.timeout_ms = keys["timeout"]
+        Solver.set(self, *args, **keys)
+
+    def check(self, *assumptions):
+        start = time.perf_counter()
+        self.portfolio_model = None
+        if portfolio_configs is not None:
+            import portfolio
+            result, self.portfolio_model = portfolio.check(
+                self, assumptions, portfolio_configs or None, timeout_ms=self.timeout_ms)
+        else:
+            result = Solver.check(self, *assumptions)
+        if capture_dir is not None:
+            record_query(self, assumptions, result, time.perf_counter() - start)
+        return result
+
+    def model(self):
+        if self.portfolio_model is not None:
+            return self.portfolio_model
+        return Solver.model(self)
+
+
+def make_solver(ctx=None):
+    """Create the solver used by all checkers and schedulers."""
+    return ToolSolver(ctx=ctx)
@@ -0,0 +1,697 @@
+from z3 import *
+from z3.z3util import get_vars
+from slicing import symbols
+from solvers import make_solver
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# =============================================
+# Python Source Front End
+# =============================================
+# Parses real Python modules with `ast` and generates the same kinds of Z3
+# queries that BasicConstraints.py writes by hand:
+#
+#   - division by zero:     path condition AND denominator == 0
+#   - index out of range:   path condition AND index outside a known length
+#   - assertion failure:    path condition AND NOT(assert test)
+#   - dead branch:          path condition AND branch condition is unsat
+#
+# Function and class bodies are analyzed as scopes of their own. Each arm of
+# a `match` is analyzed under a fresh condition (or `subject == value` for
+# literal patterns), with its capture names unconstrained.
+#
+# Variables are modelled as unbounded Int, with `//` and `%` rounding as in
+# Python. Anything the translator does not understand (calls, attributes,
+# floats, ...) becomes a fresh unconstrained value, so findings are
+# "possible" bugs, as in the hand-written checkers. A method call havocs its
+# receiver. Dead branches are only reported when the condition and the path
+# facts used to refute it involve nothing but values known to be ints (range
+# loop variables, len() results): any other name may hold a float, a string
+# or an object that the Int model does not describe.
+#
+# Files are analyzed in parallel worker processes. A content-hash cache keeps
+# the findings of every file so unchanged files are skipped on re-runs. A
+# file that cannot be parsed or analyzed (too deeply nested, out of memory,
+# an internal error) yields a parse-error or analysis-error finding instead
+# of stopping the run.
+
+QUERY_TIMEOUT_MS = 2000
+CACHE_VERSION = 3
+SKIP_DIRS = {".git", ".hg", ".tox", ".nox", ".venv", "venv", "__pycache__", "node_modules"}
+
+
+# Prefixes of fresh values that do not correspond to a source variable.
+INTERNAL_NAMES = {"unknown", "element", "quotient", "length"}
+
+
+def source_name(var):
+    """Source variable name of a (possibly fresh) Z3 constant, e.g. `i!7` -> `i`."""
+    return var.decl().name().split("!")[0]
+
+
+def as_int(e):
+    return If(e, 1, 0) if is_bool(e) else e
+
+
+def as_bool(e):
+    return e if is_bool(e) else e != 0
+
+
+def stored_names(nodes):
+    """Names assigned anywhere in `nodes` (targets, loop variables, ...)."""
+    names = set()
+    for node in nodes:
+        for n in ast.walk(node):
+            if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del)):
+                names.add(n.id)
+    return names
+
+
+def mutated_names(nodes):
+    """Names whose length may change through method calls, stores or del."""
+    names = set()
+    for node in nodes:
+        for n in ast.walk(node):
+            if isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute) \
+                    and isinstance(n.func.value, ast.Name):
+                names.add(n.func.value.id)
+            elif isinstance(n, (ast.Subscript, ast.Attribute)) \
+                    and isinstance(n.ctx, (ast.Store, ast.Del)) \
+                    and isinstance(n.value, ast.Name):
+                names.add(n.value.id)
+            elif isinstance(n, ast.AugAssign) and isinstance(n.target, ast.Name):
+                names.add(n.target.id)
+    return names
+
+
+def pattern_names(pattern):
+    """Names bound by a `match` case pattern."""
+    names = set()
+    for n in ast.walk(pattern):
+        if isinstance(n, (ast.MatchAs, ast.MatchStar)) and n.name is not None:
+            names.add(n.name)
+        elif isinstance(n, ast.MatchMapping) and n.rest is not None:
+            names.add(n.rest)
+    return names
+
+
+class ScopeAnalyzer:
+    """Generates and solves the queries for one function, class or module body."""
+
+    def __init__(self, path, name, body, params=()):
+        self.path = path
+        self.name = name
+        self.body = body
+        self.findings = []
+        self.solver = make_solver()
+        self.solver.set("timeout", QUERY_TIMEOUT_MS)
+        self.env = {p: Int(p) for p in params}
+        self.conds = []
+        self.lengths = {}
+        self.mutated = mutated_names(body)
+        # Names of the Z3 constants known to hold Python ints.
+        self.int_vars = set()
+
+    # ---------------------------------------------
+    # Queries
+    # ---------------------------------------------
+    def query(self, node, kind, condition, message, extra=()):
+        """Report `message` if `condition` is satisfiable under the path condition."""
+        self.solver.push()
+        self.solver.add(*self.conds)
+        self.solver.add(condition, *extra)
+        result = self.solver.check()
+        example = None
+        if result == sat:
+            m = self.solver.model()
+            example = ", ".join(f"{source_name(v)} = {m.eval(v, model_completion=True)}"
+                                for v in sorted(get_vars(condition), key=str)
+                                if source_name(v) not in INTERNAL_NAMES)
+        self.solver.pop()
+        if result == sat:
+            self.report(node, kind, message, example)
+        return result
+
+    def known_int(self, e):
+        return symbols(e) <= self.int_vars
+
+    def unreachable(self, condition):
+        """True if `condition` can never hold, judged only on facts about ints."""
+        if not self.known_int(condition):
+            return False
+        self.solver.push()
+        # Dropping path facts over other values only weakens the query.
+        self.solver.add(*[c for c in self.conds if self.known_int(c)])
+        self.solver.add(condition)
+        result = self.solver.check()
+        self.solver.pop()
+        return result == unsat
+
+    def report(self, node, kind, message, example=None):
+        self.findings.append({
+            "path": self.path,
+            "line": node.lineno,
+            "col": node.col_offset,
+            "scope": self.name,
+            "kind": kind,
+            "message": message,
+            "example": example or None,
+        })
+
+    # ---------------------------------------------
+    # Expressions
+    # ---------------------------------------------
+    def fresh(self, node):
+        """An unconstrained value standing in for an untranslatable expression."""
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                self.expr(child)
+        return FreshInt("unknown")
+
+    def expr(self, node):
+        try:
+            return self._expr(node)
+        except (Z3Exception, TypeError, RecursionError):
+            return FreshInt("unknown")
+
+    def _expr(self, node):
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool):
+                return BoolVal(node.value)
+            if isinstance(node.value, int):
+                return IntVal(node.value)
+            return self.fresh(node)
+        if isinstance(node, ast.Name):
+            if node.id not in self.env:
+                self.env[node.id] = Int(node.id)
+            return self.env[node.id]
+        if isinstance(node, ast.BinOp):
+            return self.binop(node)
+        if isinstance(node, ast.UnaryOp):
+            operand = self.expr(node.operand)
+            if isinstance(node.op, ast.Not):
+                return Not(as_bool(operand))
+            if isinstance(node.op, ast.USub):
+                return -as_int(operand)
+            if isinstance(node.op, ast.UAdd):
+                return as_int(operand)
+            return FreshInt("unknown")
+        if isinstance(node, ast.BoolOp):
+            return self.boolop(node)
+        if isinstance(node, ast.Compare):
+            return self.compare(node)
+        if isinstance(node, ast.NamedExpr):
+            value = self.expr(node.value)
+            self.env[node.target.id] = value
+            self.lengths.pop(node.target.id, None)
+            return value
+        if isinstance(node, ast.IfExp):
+            test = as_bool(self.expr(node.test))
+            depth = len(self.conds)
+            self.conds.append(test)
+            body = self.expr(node.body)
+            del self.conds[depth:]
+            self.conds.append(Not(test))
+            orelse = self.expr(node.orelse)
+            del self.conds[depth:]
+            if body.sort() != orelse.sort():
+                body, orelse = as_int(body), as_int(orelse)
+            return If(test, body, orelse)
+        if isinstance(node, ast.Subscript):
+            return self.subscript(node)
+        if isinstance(node, ast.Call):
+            return self.call(node)
+        return self.fresh(node)
+
+    def call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == "len" \
+                and len(node.args) == 1 and not node.keywords:
+            arg = node.args[0]
+            if isinstance(arg, ast.Name) and arg.id in self.lengths:
+                return IntVal(self.lengths[arg.id])
+            self.expr(arg)
+            length = FreshInt("length")
+            self.int_vars.add(length.decl().name())
+            self.conds.append(length >= 0)
+            return length
+        value = self.fresh(node)
+        if isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name):
+            # A method call may mutate its receiver (list.remove, dict.clear, ...).
+            self.havoc([node.func.value.id])
+        return value
+
+    def binop(self, node):
+        left = as_int(self.expr(node.left))
+        right = as_int(self.expr(node.right))
+        op = node.op
+        if isinstance(op, ast.Add):
+            return left + right
+        if isinstance(op, ast.Sub):
+            return left - right
+        if isinstance(op, ast.Mult):
+            return left * right
+        if isinstance(op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            denominator = ast.unparse(node.right)
+            self.query(node, "division-by-zero", right == 0,
+                       f"Division by zero possible ({denominator} = 0)")
+            # Continue on the path where the division succeeded.
+            self.conds.append(right != 0)
+            # Z3 rounds so that the remainder is non-negative; Python rounds
+            # towards negative infinity, giving the remainder the divisor's sign.
+            quotient, remainder = left / right, left % right
+            if isinstance(op, ast.FloorDiv):
+                return If(Or(right > 0, remainder == 0), quotient, quotient - 1)
+            if isinstance(op, ast.Mod):
+                return If(Or(right > 0, remainder == 0), remainder, remainder + right)
+            return FreshInt("quotient")
+        return FreshInt("unknown")
+
+    def boolop(self, node):
+        # Short-circuit: later operands are only evaluated when earlier ones
+        # are true (and) or false (or).
+        values = []
+        depth = len(self.conds)
+        for operand in node.values:
+            v = self.expr(operand)
+            values.append(v)
+            self.conds.append(as_bool(v) if isinstance(node.op, ast.And) else Not(as_bool(v)))
+        del self.conds[depth:]
+        if not all(is_bool(v) for v in values):
+            # `x or default` yields an operand, not a bool.
+            return FreshInt("unknown")
+        return And(values) if isinstance(node.op, ast.And) else Or(values)
+
+    def compare(self, node):
+        parts = []
+        left = self.expr(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self.expr(comparator)
+            if isinstance(op, ast.Eq):
+                parts.append(left == right)
+            elif isinstance(op, ast.NotEq):
+                parts.append(left != right)
+            elif isinstance(op, ast.Lt):
+                parts.append(as_int(left) < as_int(right))
+            elif isinstance(op, ast.LtE):
+                parts.append(as_int(left) <= as_int(right))
+            elif isinstance(op, ast.Gt):
+                parts.append(as_int(left) > as_int(right))
+            elif isinstance(op, ast.GtE):
+                parts.append(as_int(left) >= as_int(right))
+            else:
+                parts.append(FreshBool("unknown"))
+            left = right
+        return And(parts) if len(parts) > 1 else parts[0]
+
+    def subscript(self, node):
+        index_node = node.slice
+        if isinstance(index_node, ast.Slice):
+            return self.fresh(node)
+        index = as_int(self.expr(index_node))
+        if isinstance(node.value, ast.Name) and node.value.id in self.lengths:
+            name = node.value.id
+            n = self.lengths[name]
+            self.query(node, "index-out-of-range", Or(index >= n, index < -n),
+                       f"Index out of range on {name}[{ast.unparse(index_node)}] (len {n})")
+        else:
+            self.expr(node.value)
+        return FreshInt("element")
+
+    # ---------------------------------------------
+    # Statements
+    # ---------------------------------------------
+    def havoc(self, names):
+        for name in names:
+            self.env[name] = FreshInt(name)
+            self.lengths.pop(name, None)
+
+    def run(self):
+        self.block(self.body)
+        return self.findings
+
+    def block(self, stmts):
+        """Analyze a statement list; return True if it always leaves the block."""
+        for stmt in stmts:
+            if self.stmt(stmt):
+                return True
+        return False
+
+    def stmt(self, node):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            self.findings.extend(analyze_definition(self.path, node))
+            self.havoc([node.name])
+            return False
+        if isinstance(node, ast.Assign):
+            value = self.expr(node.value)
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.env[target.id] = value
+                    self.lengths.pop(target.id, None)
+                    if isinstance(node.value, (ast.List, ast.Tuple, ast.Constant)) \
+                            and target.id not in self.mutated:
+                        if isinstance(node.value, ast.Constant):
+                            if isinstance(node.value.value, (str, bytes)):
+                                self.lengths[target.id] = len(node.value.value)
+                        else:
+                            self.lengths[target.id] = len(node.value.elts)
+                else:
+                    self.expr_targets(target)
+            return False
+        if isinstance(node, ast.AugAssign):
+            value = self.expr(ast.BinOp(left=_load(node.target), op=node.op, right=node.value,
+                                        lineno=node.lineno, col_offset=node.col_offset))
+            if isinstance(node.target, ast.Name):
+                self.env[node.target.id] = value
+            else:
+                self.expr_targets(node.target)
+            return False
+        if isinstance(node, ast.AnnAssign):
+            if node.value is not None:
+                value = self.expr(node.value)
+                if isinstance(node.target, ast.Name):
+                    self.env[node.target.id] = value
+            return False
+        if isinstance(node, ast.Assert):
+            test = as_bool(self.expr(node.test))
+            self.query(node, "assertion-failure", Not(test),
+                       f"Assertion may fail: assert {ast.unparse(node.test)}")
+            self.conds.append(test)
+            return False
+        if isinstance(node, ast.If):
+            return self.if_stmt(node)
+        if isinstance(node, ast.While):
+            return self.loop(node, node.test)
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            return self.for_stmt(node)
+        if isinstance(node, (ast.Return, ast.Raise)):
+            value = node.value if isinstance(node, ast.Return) else node.exc
+            if value is not None:
+                self.expr(value)
+            return True
+        if isinstance(node, (ast.Break, ast.Continue)):
+            return True
+        if isinstance(node, ast.Expr):
+            self.expr(node.value)
+            return False
+        if isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                self.expr(item.context_expr)
+            self.havoc(stored_names([item.optional_vars for item in node.items
+                                     if item.optional_vars is not None]))
+            return self.block(node.body)
+        if isinstance(node, ast.Try) or type(node).__name__ == "TryStar":
+            return self.try_stmt(node)
+        if type(node).__name__ == "Match":
+            return self.match_stmt(node)
+        # del x[i], global, import, ...
+        self.havoc(stored_names([node]) | mutated_names([node]))
+        return False
+
+    def expr_targets(self, target):
+        """Visit an attribute/subscript/tuple assignment target and havoc its names."""
+        if isinstance(target, (ast.Tuple, ast.List)):
+            for elt in target.elts:
+                self.expr_targets(elt)
+        elif isinstance(target, ast.Subscript):
+            self.subscript(ast.Subscript(value=target.value, slice=target.slice, ctx=ast.Load(),
+                                         lineno=target.lineno, col_offset=target.col_offset))
+            if isinstance(target.value, ast.Name):
+                self.havoc([target.value.id])
+        elif isinstance(target, ast.Attribute):
+            self.expr(target.value)
+            if isinstance(target.value, ast.Name):
+                self.havoc([target.value.id])
+        elif isinstance(target, ast.Starred):
+            self.expr_targets(target.value)
+        elif isinstance(target, ast.Name):
+            self.havoc([target.id])
+
+    def branch(self, cond, stmts):
+        """Analyze `stmts` under `cond`; return (env, lengths, conds, terminated)."""
+        env, lengths, depth = dict(self.env), dict(self.lengths), len(self.conds)
+        self.conds.append(cond)
+        terminated = self.block(stmts)
+        result = (self.env, self.lengths, self.conds[depth + 1:], terminated)
+        self.env, self.lengths = env, lengths
+        del self.conds[depth:]
+        return result
+
+    def if_stmt(self, node):
+        cond = as_bool(self.expr(node.test))
+        test = ast.unparse(node.test)
+        if self.unreachable(cond):
+            self.report(node, "dead-branch", f"Dead code: condition `{test}` is never true")
+        if node.orelse and self.unreachable(Not(cond)):
+            self.report(node.orelse[0], "dead-branch",
+                        f"Dead code: else branch of `{test}` is never taken")
+        then_env, then_len, then_conds, then_term = self.branch(cond, node.body)
+        else_env, else_len, else_conds, else_term = self.branch(Not(cond), node.orelse)
+        if then_term and else_term:
+            return True
+        if then_term or else_term:
+            # Only one branch falls through: continue on that path.
+            env, lengths, taken, extra = (else_env, else_len, Not(cond), else_conds) if then_term \
+                else (then_env, then_len, cond, then_conds)
+            self.env, self.lengths = env, lengths
+            self.conds.extend([taken] + extra)
+            return False
+        for name in set(then_env) | set(else_env):
+            a, b = then_env.get(name), else_env.get(name)
+            if a is None or b is None:
+                self.env[name] = FreshInt(name)
+            elif not a.eq(b):
+                self.env[name] = If(cond, a, b) if a.sort() == b.sort() else FreshInt(name)
+        self.lengths = {k: v for k, v in then_len.items() if else_len.get(k) == v}
+        return False
+
+    def loop(self, node, test_node=None):
+        """Analyze a while loop (or a for loop over an unknown iterable)."""
+        assigned = stored_names(node.body)
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            assigned |= stored_names([node.target])
+        # Anything assigned in the body may hold any value at the loop head.
+        self.havoc(assigned)
+        cond = BoolVal(True)
+        if test_node is not None:
+            cond = as_bool(self.expr(test_node))
+            if self.unreachable(cond):
+                self.report(node, "dead-branch",
+                            f"Dead code: loop condition `{ast.unparse(test_node)}` is never true")
+        self.branch(cond, node.body)
+        # The havocked head state stands for any iteration, so a loop without
+        # break exits from it with the condition false.
+        if any(isinstance(n, ast.Break) for n in ast.walk(node)):
+            self.havoc(assigned)
+        elif test_node is not None:
+            self.conds.append(Not(cond))
+        self.block(node.orelse)
+        return False
+
+    def for_stmt(self, node):
+        self.expr(node.iter)
+        bounds = []
+        call = node.iter
+        if isinstance(node.target, ast.Name) and isinstance(call, ast.Call) \
+                and isinstance(call.func, ast.Name) and call.func.id == "range" \
+                and 1 <= len(call.args) <= 2:
+            i = FreshInt(node.target.id)
+            self.int_vars.add(i.decl().name())
+            lo = as_int(self.expr(call.args[0])) if len(call.args) == 2 else IntVal(0)
+            hi = as_int(self.expr(call.args[-1]))
+            bounds = [lo <= i, i < hi]
+            self.havoc(stored_names(node.body) | {node.target.id})
+            self.env[node.target.id] = i
+            self.branch(And(bounds), node.body)
+            self.havoc(stored_names(node.body) | {node.target.id})
+            self.block(node.orelse)
+            return False
+        return self.loop(node)
+
+    def match_stmt(self, node):
+        subject = self.expr(node.subject)
+        assigned = set()
+        terminated = True
+        for case in node.cases:
+            captures = pattern_names(case.pattern)
+            assigned |= captures | stored_names(case.body)
+            env, lengths, depth = dict(self.env), dict(self.lengths), len(self.conds)
+            self.havoc(captures)
+            cond = FreshBool("case")
+            if isinstance(case.pattern, ast.MatchValue):
+                try:
+                    cond = subject == self.expr(case.pattern.value)
+                except Z3Exception:
+                    pass
+            if case.guard is not None:
+                cond = And(cond, as_bool(self.expr(case.guard)))
+            self.conds.append(cond)
+            terminated = self.block(case.body) and terminated
+            self.env, self.lengths = env, lengths
+            del self.conds[depth:]
+        # Without a catch-all case the subject may match nothing.
+        last = node.cases[-1]
+        exhaustive = isinstance(last.pattern, ast.MatchAs) and last.pattern.pattern is None \
+            and last.guard is None
+        if terminated and exhaustive:
+            return True
+        self.havoc(assigned)
+        return False
+
+    def try_stmt(self, node):
+        assigned = stored_names(node.body)
+        self.branch(BoolVal(True), node.body)
+        for handler in node.handlers:
+            self.havoc(assigned)
+            self.branch(BoolVal(True), handler.body)
+        self.havoc(assigned | stored_names(node.handlers) | stored_names(node.orelse))
+        self.branch(BoolVal(True), node.orelse)
+        return self.block(node.finalbody)
+
+
+def _load(target):
+    if isinstance(target, ast.Name):
+        return ast.Name(id=target.id, ctx=ast.Load(), lineno=target.lineno,
+                        col_offset=target.col_offset)
+    return target
+
+
+def analyze_definition(path, node):
+    """Analyze a function or class definition in its own scope."""
+    if isinstance(node, ast.ClassDef):
+        return ScopeAnalyzer(path, node.name, node.body).run()
+    args = node.args
+    params = [a.arg for a in args.posonlyargs + args.args + args.kwonlyargs]
+    return ScopeAnalyzer(path, node.name, node.body, params).run()
+
+
+def file_finding(path, kind, message, line=0):
+    return [{"path": path, "line": line, "col": 0, "scope": "<module>",
+             "kind": kind, "message": message, "example": None}]
+
+
+def analyze_source(source, path="<string>"):
+    """Return the findings for one module's source text."""
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        return file_finding(path, "parse-error", str(e), getattr(e, "lineno", 0) or 0)
+    except (RecursionError, MemoryError) as e:
+        return file_finding(path, "parse-error", f"too deeply nested to parse ({type(e).__name__})")
+    return ScopeAnalyzer(path, "<module>", tree.body).run()
+
+
+def analyze_file(path):
+    """Findings for one file; never raises, so one bad file cannot stop a run."""
+    try:
+        with open(path, "rb") as f:
+            return analyze_source(f.read(), path)
+    except Exception as e:
+        return file_finding(path, "analysis-error", f"analysis failed: {type(e).__name__}: {e}")
+
+
+# =============================================
+# Parallel Driver and Cache
+# =============================================
+def iter_python_files(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"no such file or directory: {path}")
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield os.path.join(root, name)
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_cache(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(cache_path, files):
+    tmp = cache_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f)
+    os.replace(tmp, cache_path)
+
+
+def analyze_paths(paths, jobs=None, cache_path=None):
+    """Analyze every Python file under `paths`; return (findings, files analyzed, files cached)."""
+    cache = load_cache(cache_path)
+    files = {}
+    pending = []
+    for path in iter_python_files(paths):
+        digest = file_digest(path)
+        entry = cache.get(path)
+        if entry is not None and entry["sha256"] == digest:
+            files[path] = entry
+        else:
+            files[path] = {"sha256": digest, "findings": []}
+            pending.append(path)
+
+    if jobs == 1 or len(pending) <= 1:
+        for path in pending:
+            files[path]["findings"] = analyze_file(path)
+    else:
+        workers = jobs or os.cpu_count() or 1
+        # Batch small files together so per-task IPC does not dominate.
+        chunksize = max(1, len(pending) // (8 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for path, findings in zip(pending, executor.map(analyze_file, pending, chunksize=chunksize)):
+                files[path]["findings"] = findings
+
+    if cache_path:
+        # Keep the entries of files outside this run; drop only files that are gone.
+        kept = {path: entry for path, entry in cache.items()
+                if path not in files and os.path.exists(path)}
+        save_cache(cache_path, {**kept, **files})
+    findings = [f for path in files for f in files[path]["findings"]]
+    return findings, len(pending), len(files) - len(pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and check Z3 bug queries from Python source files.")
+    parser.add_argument("paths", nargs="+", help="Python files or directories to analyze")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default=".z3check-cache.json", help="content-hash cache file ('' to disable)")
+    parser.add_argument("--json", action="store_true", help="print findings as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        findings, analyzed, cached = analyze_paths(args.paths, args.jobs, args.cache or None)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(findings, indent=2))
+    else:
+        for f in findings:
+            example = f" when {f['example']}" if f["example"] else ""
+            print(f"⚠️ {f['path']}:{f['line']}: [{f['kind']}] {f['message']}{example}")
+        print(f"\n{len(findings)} finding(s) in {analyzed + cached} file(s) "
+              f"({analyzed} analyzed, {cached} unchanged)")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
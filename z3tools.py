@@ -0,0 +1,377 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+
+# =============================================
+# z3tools: one entry point for all scripts
+# =============================================
+#   python z3tools.py check [basic functions memory recursion] [--source PATH ...]
+#   python z3tools.py schedule-prof
+#   python z3tools.py schedule-student --courses EECS4401,MATH1000
+#   python z3tools.py bench [--repeat N]
+#   python z3tools.py scaling [memory recursion functions] [--sizes N ...]
+#   python z3tools.py replay CORPUS [--params FILE]
+#   python z3tools.py daemon [--socket PATH]
+#   python z3tools.py serve [--port N] [--workers N]   (schedule_service.py)
+#
+# `--capture DIR` (before the subcommand) records every solver query of the
+# run into DIR for offline replay; `--portfolio` races hard queries across
+# several solver configurations.
+#
+# Nothing here imports z3 at module level: each subcommand imports only the
+# script it runs. When a daemon is listening on the socket, the client
+# forwards its arguments there instead, so repeated runs (pre-commit and CI
+# hooks) skip interpreter startup, the z3 native library load, and catalog
+# setup entirely. A daemon whose modules were edited after it loaded them
+# refuses further requests and exits; the client then runs locally.
+
+# checker name -> (module, entry function)
+CHECKERS = {
+    "basic": ("BasicConstraints", "detect_bugs"),
+    "functions": ("ConstratintsWithFunctions", "analyze_program_with_functions"),
+    "memory": ("AdvancedMemory", "memory_safety_checker"),
+    "recursion": ("AdvancedRecursion", "recursion_analyzer"),
+}
+
+# Modules loaded up front by the daemon so requests find them warm.
+PRELOAD = ["z3", "solvers", "schedule_prof", "schedule_student", "source_checker", "replay"] + \
+    [module for module, _ in CHECKERS.values()]
+
+
+def default_socket_path():
+    return os.environ.get("Z3TOOLS_SOCKET") or \
+        os.path.join(tempfile.gettempdir(), f"z3tools-{os.getuid()}.sock")
+
+
+def module_mtimes():
+    """Modification times of the loaded modules that live next to this script."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    mtimes = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        path = path and os.path.abspath(path)
+        if path and os.path.dirname(path) == here:
+            with contextlib.suppress(OSError):
+                mtimes[path] = os.stat(path).st_mtime_ns
+    return mtimes
+
+
+def load(module, name=None):
+    """Import a script module on first use (and optionally one of its attributes)."""
+    mod = importlib.import_module(module)
+    return getattr(mod, name) if name else mod
+
+
+# ---------------------------------------------
+# Subcommands
+# ---------------------------------------------
+def cmd_check(args):
+    status = 0
+    for name in args.checkers or ([] if args.source else list(CHECKERS)):
+        module, entry = CHECKERS[name]
+        if name == "basic":
+            load(module, entry)(bits=args.bits, signed=not args.unsigned)
+        else:
+            load(module, entry)()
+    if args.source:
+        argv = list(args.source) + ["--cache", args.cache]
+        if args.jobs is not None:
+            argv += ["--jobs", str(args.jobs)]
+        status = load("source_checker", "main")(argv)
+    return status
+
+
+def cmd_schedule_prof(args):
+    load("schedule_prof", "print_schedule")(num_slots=args.slots, num_rooms=args.rooms)
+    return 0
+
+
+def cmd_schedule_student(args):
+    return load("schedule_student", "main")(args.courses)
+
+
+def cmd_bench(args):
+    print(f"{'checker':<12} {'runs':>5} {'min ms':>10} {'median ms':>10}")
+    for name in args.checkers or list(CHECKERS):
+        module, entry = CHECKERS[name]
+        fn = load(module, entry)
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+            times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+        print(f"{name:<12} {len(times):>5} {times[0]:>10.2f} {times[len(times) // 2]:>10.2f}")
+    return 0
+
+
+def cmd_scaling(args):
+    return load("benchmarks", "main")(args.args)
+
+
+def cmd_replay(args):
+    return load("replay", "main")(args.args)
+
+
+def cmd_serve(args):
+    return load("schedule_service", "main")(args.args)
+
+
+def cmd_daemon(args):
+    for module in PRELOAD:
+        load(module)
+    path = args.socket
+    if os.path.exists(path):
+        if connect(path) is not None:
+            print(f"z3tools daemon already listening on {path}", file=sys.stderr)
+            return 1
+        os.unlink(path)
+
+    loaded = module_mtimes()
+
+    def stale():
+        for module_path, mtime in loaded.items():
+            try:
+                if os.stat(module_path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline())
+            if stale():
+                # Running edited sources against modules loaded earlier would
+                # mix old and new code; the client runs the request itself.
+                self.server.stale = True
+                response = {"stale": True}
+            else:
+                response = run_captured(request["argv"], request.get("stdin") or "", request.get("cwd"))
+                # Modules imported on demand by this request are watched from now on.
+                for module_path, mtime in module_mtimes().items():
+                    loaded.setdefault(module_path, mtime)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    # Requests are served one at a time: each one redirects the process-wide
+    # stdout/stderr and working directory while it runs.
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        server.stale = False
+        print(f"z3tools daemon listening on {path}", file=sys.stderr)
+        try:
+            while not server.stale:
+                server.handle_request()
+            print("z3tools daemon: sources changed since startup; exiting", file=sys.stderr)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
+    return 0
+
+
+# ---------------------------------------------
+# Argument parsing and dispatch
+# ---------------------------------------------
+def checker_name(value):
+    # argparse rejects an empty nargs="*" list when `choices` is set, so
+    # checker names are validated here instead.
+    if value not in CHECKERS:
+        raise argparse.ArgumentTypeError(f"invalid checker {value!r} (choose from {', '.join(CHECKERS)})")
+    return value
+
+
+def add_global_options(parser):
+    parser.add_argument("--socket", default=default_socket_path(),
+                        help="daemon socket path (default: $Z3TOOLS_SOCKET or a per-user temp file)")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="always run in this process, even if a daemon is listening")
+    parser.add_argument("--capture", metavar="DIR",
+                        help="write every solver query of this run to DIR as .smt2.gz files")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="race hard queries across several solver configurations in parallel")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="z3tools", description="Z3 bug detection and scheduling tools.")
+    add_global_options(parser)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check = sub.add_parser("check", help="run bug-detection checkers")
+    check.add_argument("checkers", nargs="*", type=checker_name, metavar="CHECKER",
+                       help=f"checkers to run: {', '.join(CHECKERS)} (default: all, unless --source is given)")
+    check.add_argument("--bits", type=int, choices=[8, 16, 32, 64],
+                       help="bitvector width for the basic checker")
+    check.add_argument("--unsigned", action="store_true", help="unsigned semantics with --bits")
+    check.add_argument("--source", nargs="+", metavar="PATH",
+                       help="also generate and check queries from these Python files/directories")
+    check.add_argument("--cache", default=".z3check-cache.json", help="source checker cache file")
+    check.add_argument("-j", "--jobs", type=int, help="source checker worker processes")
+    check.set_defaults(func=cmd_check)
+
+    prof = sub.add_parser("schedule-prof", help="generate a professor/room schedule")
+    prof.add_argument("--slots", type=int, default=4, help="number of time slots")
+    prof.add_argument("--rooms", type=int, default=3, help="number of rooms")
+    prof.set_defaults(func=cmd_schedule_prof)
+
+    student = sub.add_parser("schedule-student", help="enumerate a student's valid schedules")
+    student.add_argument("--courses", help="comma-separated course codes (prompted if omitted)")
+    student.set_defaults(func=cmd_schedule_student)
+
+    bench = sub.add_parser("bench", help="time the bug-detection checkers")
+    bench.add_argument("checkers", nargs="*", type=checker_name, metavar="CHECKER",
+                       help="checkers to time (default: all)")
+    bench.add_argument("--repeat", type=int, default=5, help="runs per checker")
+    bench.set_defaults(func=cmd_bench)
+
+    scaling = sub.add_parser("scaling", add_help=False,
+                             help="time the checkers on generated scenarios of growing size")
+    scaling.add_argument("args", nargs=argparse.REMAINDER, help="arguments for benchmarks.py")
+    scaling.set_defaults(func=cmd_scaling)
+
+    replay = sub.add_parser("replay", add_help=False,
+                            help="re-solve a captured query corpus across Z3 parameter sets")
+    replay.add_argument("args", nargs=argparse.REMAINDER, help="arguments for replay.py")
+    replay.set_defaults(func=cmd_replay)
+
+    serve = sub.add_parser("serve", add_help=False,
+                           help="serve scheduling requests to many clients (asyncio, streamed JSON)")
+    serve.add_argument("args", nargs=argparse.REMAINDER, help="arguments for schedule_service.py")
+    serve.set_defaults(func=cmd_serve)
+
+    daemon = sub.add_parser("daemon", help="keep z3 and the catalogs loaded and serve requests")
+    daemon.set_defaults(func=cmd_daemon)
+    return parser
+
+
+# Subcommands that hand their arguments to another script's main() verbatim.
+PASSTHROUGH = {"scaling", "replay", "serve"}
+
+
+def parse_args(argv):
+    """Parse `argv`; everything after a pass-through subcommand is kept as is."""
+    parser = build_parser()
+    # Find the subcommand by parsing only the global options in front of it.
+    # A subparser's REMAINDER cannot start with an option (`scaling --sizes
+    # 5`), and options such as --socket would be taken by the main parser.
+    front = argparse.ArgumentParser(add_help=False)
+    add_global_options(front)
+    front.add_argument("command", nargs="?")
+    front.add_argument("rest", nargs=argparse.REMAINDER)
+    head, _ = front.parse_known_args(argv)
+    if head.command in PASSTHROUGH:
+        args = parser.parse_args(argv[:len(argv) - len(head.rest)])
+        args.args = head.rest
+        return args
+    return parser.parse_args(argv)
+
+
+def run(argv):
+    """Parse `argv` and run the subcommand in this process; return its exit status."""
+    args = parse_args(argv)
+    if not (args.capture or args.portfolio):
+        return args.func(args) or 0
+    solvers = load("solvers")
+    # Restored afterwards: the daemon may itself run with capture or the
+    # portfolio enabled (through the environment).
+    capture_dir, portfolio_configs = solvers.capture_dir, solvers.portfolio_configs
+    if args.capture:
+        solvers.start_capture(args.capture)
+    if args.portfolio:
+        solvers.enable_portfolio()
+    try:
+        return args.func(args) or 0
+    finally:
+        if args.capture:
+            if capture_dir is None:
+                solvers.stop_capture()
+            else:
+                solvers.start_capture(capture_dir)
+        if args.portfolio:
+            if portfolio_configs is None:
+                solvers.disable_portfolio()
+            else:
+                solvers.enable_portfolio(portfolio_configs)
+
+
+def run_captured(argv, stdin="", cwd=None):
+    """Run `argv` with stdin/stdout/stderr redirected; used by the daemon."""
+    out, err = io.StringIO(), io.StringIO()
+    old_stdin, old_cwd = sys.stdin, os.getcwd()
+    sys.stdin = io.StringIO(stdin)
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                status = run(argv)
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except EOFError:
+                print("error: no input available; pass --courses when using the daemon", file=sys.stderr)
+                status = 1
+            except Exception as e:
+                print(f"error: {type(e).__name__}: {e}", file=sys.stderr)
+                status = 1
+    finally:
+        sys.stdin = old_stdin
+        os.chdir(old_cwd)
+    return {"status": status, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward(sock, argv, args):
+    """Send `argv` to a running daemon and replay its output here.
+
+    Returns None if the daemon refused the request because its modules are stale.
+    """
+    # Only the student scheduler prompts for input; never block on stdin otherwise.
+    stdin = ""
+    if args.command == "schedule-student" and args.courses is None \
+            and sys.stdin is not None and not sys.stdin.isatty():
+        stdin = sys.stdin.read()
+    request = {"argv": argv, "stdin": stdin, "cwd": os.getcwd()}
+    with sock, sock.makefile("rwb") as f:
+        f.write(json.dumps(request).encode() + b"\n")
+        f.flush()
+        response = json.loads(f.readline())
+    if response.get("stale"):
+        # Hand any input already read to the local run.
+        sys.stdin = io.StringIO(stdin)
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["status"]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    if args.command not in ("daemon", "serve") and not args.no_daemon and os.path.exists(args.socket):
+        sock = connect(args.socket)
+        if sock is not None:
+            status = forward(sock, argv, args)
+            if status is not None:
+                return status
+    return run(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())